@@ -10,8 +10,14 @@ Aplica hunks de diferentes tipos ao conteúdo do ficheiro
 
 import re
 
+import sys
+
+from bisect import bisect_right
+
 from typing import List, Dict, Any, Optional, Tuple
 
+from dataclasses import replace
+
 from parser_handler import Hunk, HunkLine
 
 
@@ -30,7 +36,193 @@ class PatchApplier:
 
         self.revert = revert
 
-    
+        # Cache por ficheiro: linhas sem '\n' e respetivos hashes
+
+        self._stripped: List[str] = []
+
+        self._line_hashes: List[int] = []
+
+        # Regiões alteradas (coordenadas do conteúdo final) da sessão atual
+
+        self._changed_ranges: List[List[int]] = []
+
+        # Posição (coordenadas atuais) logo após o último hunk aplicado -
+
+        # serve de pista para âncoras sem offset declarado
+
+        self._cursor: Optional[int] = None
+
+        # Hits do varrimento multi-âncora (lazy)
+
+        self._anchor_hits: Optional[Dict[str, List[int]]] = None
+
+        self._session_hunks: Optional[List[Hunk]] = None
+
+
+
+    def _build_line_cache(self, content: List[str]) -> None:
+
+        """Constrói o cache de linhas (sem '\\n') e hashes para pesquisas"""
+
+        # Intern de linhas curtas: igualdade com as linhas (também internadas)
+
+        # dos hunks resolve-se por comparação de ponteiros
+
+        stripped = [
+
+            sys.intern(s) if len(s) < 256 else s
+
+            for s in (line.rstrip('\n') for line in content)
+
+        ]
+
+        self._stripped = stripped
+
+        self._line_hashes = [hash(line) for line in stripped]
+
+
+
+    def _splice_line_cache(self, content: List[str], start: int, old_len: int, new_len: int) -> None:
+
+        """Atualiza o cache após substituir old_len linhas por new_len em start
+
+
+
+        Só a região alterada é recalculada; os hits do varrimento de
+
+        âncoras são invalidados (posições deslocaram-se) e reconstruídos
+
+        sob demanda.
+
+        """
+
+        new_stripped = [
+
+            sys.intern(s) if len(s) < 256 else s
+
+            for s in (line.rstrip('\n') for line in content[start:start + new_len])
+
+        ]
+
+        self._stripped[start:start + old_len] = new_stripped
+
+        self._line_hashes[start:start + old_len] = [hash(line) for line in new_stripped]
+
+        self._anchor_hits = None
+
+        # Registar a região alterada, deslocando as já registadas que ficam
+
+        # depois deste splice
+
+        delta = new_len - old_len
+
+        if delta:
+
+            for region in self._changed_ranges:
+
+                if region[0] >= start + old_len:
+
+                    region[0] += delta
+
+                    region[1] += delta
+
+        self._changed_ranges.append([start, start + new_len])
+
+        self._cursor = start + new_len
+
+
+
+    def _prescan_anchors(self, hunks: List[Hunk]) -> None:
+
+        """Varre o ficheiro uma única vez à procura de todas as âncoras
+
+
+
+        Um só finditer com a alternância dos padrões substitui K varrimentos
+
+        independentes; as linhas candidatas são depois confirmadas padrão a
+
+        padrão (cobre alvos sobrepostos na mesma linha).
+
+        """
+
+        self._anchor_hits = None
+
+        targets = set()
+
+        for hunk in hunks:
+
+            if hunk.anchor:
+
+                first = hunk.anchor.split('\n', 1)[0].strip()
+
+                if first:
+
+                    targets.add(first)
+
+        # Com 0 ou 1 padrões o varrimento combinado não amortiza
+
+        if len(targets) < 2:
+
+            return
+
+
+
+        stripped = self._stripped
+
+        big = '\n'.join(stripped)
+
+        line_starts = [0]
+
+        pos = 0
+
+        for line in stripped:
+
+            pos += len(line) + 1
+
+            line_starts.append(pos)
+
+
+
+        combined = re.compile('|'.join(
+
+            re.escape(target) for target in sorted(targets, key=len, reverse=True)
+
+        ))
+
+        # Como nenhum alvo contém '\n', toda a linha com ocorrências gera
+
+        # pelo menos um match - basta mapear offsets para índices de linha
+
+        candidates = sorted({
+
+            bisect_right(line_starts, match.start()) - 1
+
+            for match in combined.finditer(big)
+
+        })
+
+        self._anchor_hits = {
+
+            target: [i for i in candidates if target in stripped[i]]
+
+            for target in targets
+
+        }
+
+
+
+    def _get_anchor_hits(self) -> Optional[Dict[str, List[int]]]:
+
+        """Hits do varrimento multi-âncora, refeitos sob demanda após mudanças"""
+
+        if self._anchor_hits is None and self._session_hunks is not None:
+
+            self._prescan_anchors(self._session_hunks)
+
+        return self._anchor_hits
+
+
 
     def apply_hunks(self, content: List[str], hunks: List[Hunk], ui) -> Tuple[List[str], Dict[str, Any]]:
 
@@ -58,6 +250,20 @@ class PatchApplier:
 
         modified_content = content.copy()
 
+        self._build_line_cache(modified_content)
+
+        self._session_hunks = hunks
+
+        self._prescan_anchors(hunks)
+
+        self._changed_ranges = []
+
+        self._cursor = None
+
+        # Desvio acumulado de linhas introduzido pelos hunks já aplicados
+
+        self._offset_delta = 0
+
         results = {
 
             'applied': 0,
@@ -68,7 +274,7 @@ class PatchApplier:
 
         }
 
-        
+
 
         for i, hunk in enumerate(hunks):
 
@@ -96,6 +302,22 @@ class PatchApplier:
 
                     results['applied'] += 1
 
+                    # O cache de linhas foi atualizado no local da mudança;
+
+                    # resta acumular o desvio de posições
+
+                    added = sum(1 for line in hunk.lines if line.type == '+')
+
+                    removed = sum(1 for line in hunk.lines if line.type == '-')
+
+                    if self.revert:
+
+                        self._offset_delta += removed - added
+
+                    else:
+
+                        self._offset_delta += added - removed
+
                     ui.logger.log_event("HUNK_APPLIED", f"Hunk {i+1} ({hunk.type})")
 
                 else:
@@ -116,7 +338,9 @@ class PatchApplier:
 
                 ui.logger.log_event("HUNK_ERROR", warning)
 
-        
+
+
+        results['changed_ranges'] = [tuple(region) for region in self._changed_ranges]
 
         return modified_content, results
 
@@ -126,7 +350,29 @@ class PatchApplier:
 
         """Aplica hunk unified diff"""
 
-        # Find best position (ignore offsets)
+        # Em modo revert, inverter o hunk ('+' <-> '-', old <-> new) e
+
+        # aplicá-lo pelo caminho normal - a lógica torna-se simétrica
+
+        if self.revert:
+
+            hunk = self._invert_unified_hunk(hunk)
+
+        # Caminho rápido: tentar primeiro o offset declarado no hunk,
+
+        # corrigido pelo desvio dos hunks já aplicados
+
+        if hunk.expected_line is not None:
+
+            expected = hunk.expected_line + self._offset_delta
+
+            if 0 <= expected < len(content) and self._validate_unified_context(content, hunk, expected):
+
+                return self._perform_unified_changes(content, hunk, expected)
+
+
+
+        # Fallback: procurar a melhor posição ignorando offsets
 
         target_line = self._find_best_unified_position(content, hunk)
 
@@ -152,7 +398,43 @@ class PatchApplier:
 
         return self._perform_unified_changes(content, hunk, target_line)
 
-    
+
+
+    def _invert_unified_hunk(self, hunk: Hunk) -> Hunk:
+
+        """Constrói o hunk inverso: '+' vira '-' e old/new trocam de papel"""
+
+        swap = {'+': '-', '-': '+'}
+
+        inverted_lines = [
+
+            HunkLine(type=swap.get(line.type, line.type), content=line.content, line_num=line.line_num)
+
+            for line in hunk.lines
+
+        ]
+
+        return replace(
+
+            hunk,
+
+            lines=inverted_lines,
+
+            types=hunk.types.translate(bytes.maketrans(b'+-', b'-+')),
+
+            old_start=hunk.new_start,
+
+            old_count=hunk.new_count,
+
+            new_start=hunk.old_start,
+
+            new_count=hunk.old_count,
+
+            expected_line=(hunk.new_start - 1) if hunk.new_start is not None else hunk.expected_line,
+
+        )
+
+
 
     def _apply_explicit_anchor_hunk(self, content: List[str], hunk: Hunk, results: Dict[str, Any], ui) -> bool:
 
@@ -164,13 +446,39 @@ class PatchApplier:
 
             return False
 
-        
+
+
+        # Caminho rápido: sondar perto da posição provável, se conhecida
+
+        hint = self._anchor_hint(hunk)
+
+        probed = self._probe_anchor_near(content, hunk, hint)
+
+        if probed is not None:
+
+            return self._perform_anchor_changes(content, hunk, probed)
+
+
 
         # Encontrar todas as ocorrências da âncora
 
         matches = self._find_anchor_matches(content, hunk.anchor)
 
-        
+
+
+        # Entre ocorrências homónimas, preferir aquelas onde as linhas a
+
+        # remover realmente existem
+
+        if len(matches) > 1:
+
+            validated = [m for m in matches if self._removals_found_at(hunk, m)]
+
+            if validated:
+
+                matches = validated
+
+
 
         if len(matches) == 0:
 
@@ -186,7 +494,7 @@ class PatchApplier:
 
             # Múltiplas ocorrências - pedir desambiguação
 
-            target_line = ui.disambiguate_anchor(content, hunk.anchor, matches, self.context_lines)
+            target_line = ui.disambiguate_anchor(content, hunk.anchor, matches, self.context_lines, hint_line=hint)
 
             if target_line is None:
 
@@ -212,13 +520,39 @@ class PatchApplier:
 
             return False
 
-        
+
+
+        # Caminho rápido: sondar perto da posição provável, se conhecida
+
+        hint = self._anchor_hint(hunk)
+
+        probed = self._probe_anchor_near(content, hunk, hint)
+
+        if probed is not None:
+
+            return self._perform_anchor_changes(content, hunk, probed)
+
+
 
         # Encontrar ocorrências da âncora implícita
 
         matches = self._find_anchor_matches(content, hunk.anchor)
 
-        
+
+
+        # Entre ocorrências homónimas, preferir aquelas onde as linhas a
+
+        # remover realmente existem
+
+        if len(matches) > 1:
+
+            validated = [m for m in matches if self._removals_found_at(hunk, m)]
+
+            if validated:
+
+                matches = validated
+
+
 
         if len(matches) == 0:
 
@@ -234,7 +568,7 @@ class PatchApplier:
 
             # Múltiplas ocorrências - pedir desambiguação
 
-            target_line = ui.disambiguate_anchor(content, hunk.anchor, matches, self.context_lines)
+            target_line = ui.disambiguate_anchor(content, hunk.anchor, matches, self.context_lines, hint_line=hint)
 
             if target_line is None:
 
@@ -256,15 +590,11 @@ class PatchApplier:
 
         # Extrair linhas de contexto do hunk
 
-        context_lines = []
+        # O parser entrega conteúdos já sem '\n' - comparar diretamente
 
-        for line in hunk.lines:
+        context_lines = [line.content for line in hunk.lines if line.type == ' ']
 
-            if line.type == ' ':
 
-                context_lines.append(line.content.rstrip('\n'))
-
-        
 
         if not context_lines:
 
@@ -274,31 +604,39 @@ class PatchApplier:
 
                 if line.type == '-':
 
-                    return self._find_line_in_content(content, line.content.rstrip('\n'))
+                    return self._find_line_in_content(content, line.content)
 
             return None
 
-        
 
-        # Procurar sequência de contexto no conteúdo
 
-        for i in range(len(content) - len(context_lines) + 1):
+        # Procurar sequência de contexto via hashes pré-calculados:
 
-            match = True
+        # comparar strings apenas quando a janela de hashes coincide
 
-            for j, context_line in enumerate(context_lines):
+        ctx_hashes = [hash(line) for line in context_lines]
 
-                if content[i + j].rstrip('\n') != context_line:
+        first_hash = ctx_hashes[0]
 
-                    match = False
+        hashes = self._line_hashes
 
-                    break
+        stripped = self._stripped
 
-            if match:
+        window = len(context_lines)
+
+
+
+        for i in range(len(content) - window + 1):
+
+            if hashes[i] != first_hash:
+
+                continue
+
+            if hashes[i:i + window] == ctx_hashes and stripped[i:i + window] == context_lines:
 
                 return i
 
-        
+
 
         return None
 
@@ -308,9 +646,13 @@ class PatchApplier:
 
         """Encontra linha específica no conteúdo"""
 
-        for i, line in enumerate(content):
+        target_hash = hash(target)
+
+        stripped = self._stripped
 
-            if line.rstrip('\n') == target:
+        for i, line_hash in enumerate(self._line_hashes):
+
+            if line_hash == target_hash and stripped[i] == target:
 
                 return i
 
@@ -324,35 +666,33 @@ class PatchApplier:
 
         content_idx = start_line
 
-        
+        stripped = self._stripped
 
-        for line in hunk.lines:
+        hashes = self._line_hashes
 
-            if line.type == ' ':  # Linha de contexto
+        total = len(content)
 
-                if content_idx >= len(content):
 
-                    return False
 
-                if content[content_idx].rstrip('\n') != line.content.rstrip('\n'):
+        for line in hunk.lines:
 
-                    return False
+            if line.type in (' ', '-'):  # Contexto ou linha a ser removida
 
-                content_idx += 1
+                if content_idx >= total:
 
-            elif line.type == '-':  # Linha a ser removida
+                    return False
 
-                if content_idx >= len(content):
+                expected = line.content
 
-                    return False
+                # Comparar primeiro o hash; a string só em caso de colisão
 
-                if content[content_idx].rstrip('\n') != line.content.rstrip('\n'):
+                if hashes[content_idx] != hash(expected) or stripped[content_idx] != expected:
 
                     return False
 
                 content_idx += 1
 
-        
+
 
         return True
 
@@ -364,141 +704,241 @@ class PatchApplier:
 
         try:
 
-            # Processar mudanças em ordem reversa para manter índices válidos
+            # Construir o novo bloco numa única passagem e substituir a
 
-            changes = []
+            # região antiga com uma só atribuição de slice (O(N) total);
 
-            content_idx = start_line
+            # em modo revert o hunk já chega aqui invertido
 
-            
+            new_block = []
+
+            content_idx = start_line
 
-            # Primeiro, identificar todas as mudanças
+            last_is_addition = False
 
             for line in hunk.lines:
 
-                if line.type == ' ':  # Contexto - apenas avançar
+                if line.type == ' ':  # Contexto - manter linha original
 
-                    content_idx += 1
+                    new_block.append(content[content_idx])
 
-                elif line.type == '-':  # Remoção
+                    content_idx += 1
 
-                    if not self.revert:
+                    last_is_addition = False
 
-                        changes.append(('remove', content_idx, line.content))
+                elif line.type == '-':  # Remoção - consumir sem emitir
 
                     content_idx += 1
 
                 elif line.type == '+':  # Adição
 
-                    if not self.revert:
+                    new_line = line.content
 
-                        changes.append(('add', content_idx, line.content))
+                    if not new_line.endswith('\n'):
 
-                    # Não incrementar content_idx para adições
+                        new_line += '\n'
 
-            
+                    new_block.append(new_line)
 
-            # Se estiver revertendo, inverter as operações
+                    last_is_addition = True
 
-            if self.revert:
 
-                for line in hunk.lines:
 
-                    if line.type == '+':  # Adição vira remoção
+            # Toda a adição leva '\n'; só a última pode ficar sem ele, quando
 
-                        for i, content_line in enumerate(content[start_line:], start_line):
+            # é ela a fechar o ficheiro (a região substituída chega ao fim)
 
-                            if content_line.rstrip('\n') == line.content.rstrip('\n'):
+            if last_is_addition and content_idx >= len(content) and new_block[-1].endswith('\n'):
 
-                                changes.append(('remove', i, line.content))
+                new_block[-1] = new_block[-1][:-1]
 
-                                break
 
-                    elif line.type == '-':  # Remoção vira adição
 
-                        changes.append(('add', content_idx, line.content))
+            content[start_line:content_idx] = new_block
 
-            
+            self._splice_line_cache(content, start_line, content_idx - start_line, len(new_block))
 
-            # Aplicar mudanças em ordem reversa
+            return True
 
-            changes.sort(key=lambda x: x[1], reverse=True)
 
-            
 
-            for change_type, idx, line_content in changes:
+        except Exception:
 
-                if change_type == 'remove':
+            return False
 
-                    if idx < len(content):
+    
 
-                        content.pop(idx)
+    def _anchor_hint(self, hunk: Hunk) -> Optional[int]:
 
-                elif change_type == 'add':
+        """Posição provável de uma âncora, em coordenadas atuais
 
-                    # Garantir que a linha tem terminação adequada
 
-                    if not line_content.endswith('\n') and idx < len(content):
 
-                        line_content += '\n'
+        Com offset declarado no hunk, usa-o corrigido pelo desvio acumulado;
 
-                    content.insert(idx, line_content)
+        sem offset (o caso normal das âncoras), usa o cursor após o último
 
-            
+        hunk aplicado - em patches bem formados os hunks seguem a ordem do
+
+        ficheiro, por isso a âncora seguinte costuma estar logo a seguir.
+
+        """
+
+        if hunk.expected_line is not None:
+
+            return hunk.expected_line + self._offset_delta
+
+        return self._cursor
+
+
+
+    def _removals_found_at(self, hunk: Hunk, anchor_line: int) -> bool:
+
+        """Verifica se as remoções do hunk existem a partir de anchor_line
+
+
+
+        Usa a mesma janela e semântica de substring da pesquisa feita em
+
+        _perform_anchor_changes; um hunk sem remoções valida em qualquer
+
+        posição.
+
+        """
+
+        removal_type = '+' if self.revert else '-'
+
+        removals = [line.content for line in hunk.lines if line.type == removal_type]
+
+        if not removals:
 
             return True
 
-            
 
-        except Exception:
 
-            return False
+        stripped = self._stripped
+
+        search_end = min(len(stripped), anchor_line + len(removals) * 2)
+
+        for removal in removals:
+
+            target = removal.strip()
+
+            if not any(target in stripped[i] for i in range(anchor_line, search_end)):
+
+                return False
+
+        return True
+
+
+
+    def _probe_anchor_near(self, content: List[str], hunk: Hunk, center: Optional[int]) -> Optional[int]:
+
+        """Sonda a âncora do hunk numa janela em torno de center (coordenadas atuais)
+
+
+
+        Só aceita a posição quando a ocorrência é única dentro da janela e
+
+        as remoções do hunk existem a partir dela; caso contrário devolve
+
+        None e o chamador segue pelo caminho completo, com desambiguação.
+
+        """
+
+        if center is None:
+
+            return None
+
+
+
+        targets = [line.strip() for line in hunk.anchor.split('\n')]
+
+        start = max(0, center - self.context_lines)
+
+        end = min(len(content) - len(targets) + 1, center + self.context_lines + 1)
+
+        stripped = self._stripped
+
+
+
+        hits = [
+
+            i for i in range(start, end)
+
+            if all(target in stripped[i + j] for j, target in enumerate(targets))
+
+        ]
+
+        if len(hits) == 1 and self._removals_found_at(hunk, hits[0]):
+
+            return hits[0]
+
+
+
+        return None
+
 
-    
 
     def _find_anchor_matches(self, content: List[str], anchor: str) -> List[int]:
 
         """Encontra todas as ocorrências de uma âncora no conteúdo"""
 
+        # A correspondência é sempre por substring; a primeira linha da
+        # âncora usa os hits do varrimento combinado (que têm exatamente
+        # essa semântica e cobrem todas as ocorrências) ou, na falta deles,
+        # um varrimento linear - nunca um índice de igualdade exata, que
+        # deixaria de fora ocorrências parciais
+
         matches = []
 
-        anchor_lines = anchor.split('\n')
+        stripped = self._stripped
 
-        
+        targets = [anchor_line.strip() for anchor_line in anchor.split('\n')]
+
+        hits = self._get_anchor_hits()
 
-        if len(anchor_lines) == 1:
+        if hits is not None and targets[0] in hits:
 
-            # Âncora de linha única
+            candidates = hits[targets[0]]
 
-            target = anchor_lines[0].strip()
+        else:
 
-            for i, line in enumerate(content):
+            candidates = [i for i, line in enumerate(stripped) if targets[0] in line]
 
-                if target in line.rstrip('\n'):
 
-                    matches.append(i)
 
-        else:
+        if len(targets) == 1:
 
-            # Âncora multilinha
+            return list(candidates)
 
-            for i in range(len(content) - len(anchor_lines) + 1):
 
-                match = True
 
-                for j, anchor_line in enumerate(anchor_lines):
+        # Âncora multilinha: confirmar as linhas seguintes em cada candidato
 
-                    if anchor_line.strip() not in content[i + j].rstrip('\n'):
+        limit = len(stripped) - len(targets) + 1
 
-                        match = False
+        for i in candidates:
 
-                        break
+            if i >= limit:
 
-                if match:
+                continue
+
+            match = True
+
+            for j, target in enumerate(targets):
+
+                if target not in stripped[i + j]:
+
+                    match = False
+
+                    break
+
+            if match:
+
+                matches.append(i)
 
-                    matches.append(i)
 
-        
 
         return matches
 
@@ -552,11 +992,13 @@ class PatchApplier:
 
                 
 
+                stripped = self._stripped
+
                 for removal in removals:
 
                     for i in range(search_start, search_end):
 
-                        if i < len(content) and removal.strip() in content[i].rstrip('\n'):
+                        if i < len(content) and removal.strip() in stripped[i]:
 
                             removal_indices.append(i)
 
@@ -564,31 +1006,43 @@ class PatchApplier:
 
             
 
-            # Remover linhas em ordem reversa
+            # As remoções ficam todas em/apos a âncora, por isso a mudança é
 
-            for idx in sorted(removal_indices, reverse=True):
+            # local: substituir apenas a região [âncora, última remoção)
 
-                if idx < len(content):
+            removal_set = set(removal_indices)
 
-                    content.pop(idx)
+            lo = anchor_line
 
-            
+            hi = max(removal_indices) + 1 if removal_indices else anchor_line
 
-            # Adicionar novas linhas na posição da âncora
+            kept = [line for i, line in enumerate(content[lo:hi], lo) if i not in removal_set]
 
-            insert_pos = anchor_line
+
+
+            # As adições recebem '\n' exceto quando ficam no fim do ficheiro
+
+            needs_newline = anchor_line < len(content) - len(removal_set)
+
+            block = []
 
             for addition in additions:
 
-                if not addition.endswith('\n') and insert_pos < len(content):
+                if needs_newline and not addition.endswith('\n'):
 
                     addition += '\n'
 
-                content.insert(insert_pos, addition)
+                block.append(addition)
+
+
+
+            new_region = block + kept
+
+            content[lo:hi] = new_region
+
+            self._splice_line_cache(content, lo, hi - lo, len(new_region))
 
-                insert_pos += 1
 
-            
 
             return True
 
@@ -12,10 +12,14 @@ Módulo para corrigir automaticamente problemas de indentação em ficheiros Pyt
 
 import ast
 
+import hashlib
+
 import re
 
 import tokenize
 
+from math import gcd
+
 from io import StringIO
 
 from pathlib import Path
@@ -26,6 +30,36 @@ from typing import List, Tuple, Optional, Dict
 
 
 
+# Regex compilada uma única vez para extrair o prefixo de indentação
+
+_LEADING_WS_RE = re.compile(r'^[ \t]*')
+
+
+
+# Variante multilinha: localiza de uma só vez todos os prefixos indentados
+
+# (em bytes: a correção opera sobre o buffer UTF-8, onde 0x09/0x20/0x0A
+
+# nunca ocorrem em bytes de continuação)
+
+_INDENT_RUN_RE = re.compile(rb'(?m)^[ \t]+')
+
+
+
+# Linhas compostas apenas por espaços/tabs (a correção esvazia-as)
+
+_WS_ONLY_LINE_RE = re.compile(rb'(?m)^[ \t]+$')
+
+
+
+# Prefixos de indentação de linhas com conteúdo, extraídos de uma só vez
+
+_DETECT_INDENT_RE = re.compile(r'(?m)^([ \t]+)(?=\S)')
+
+
+
+
+
 class IndentationCorrector:
 
     """Corretor de indentação para ficheiros Python"""
@@ -54,6 +88,36 @@ class IndentationCorrector:
 
         self.indent_unit = ' ' * tab_size if use_spaces else '\t'
 
+        # Unidades de indentação pré-multiplicadas, em bytes, para os
+
+        # níveis habituais (o caminho quente da correção opera em bytes)
+
+        self._indent_unit_b = self.indent_unit.encode('ascii')
+
+        self._indent_cache = tuple(self._indent_unit_b * level for level in range(32))
+
+        # Memoização de validações de sintaxe (hash do conteúdo -> resultado)
+
+        self._syntax_cache: Dict[int, Tuple[bool, Optional[str]]] = {}
+
+        # Memoização de correções completas ((digest, caminho) -> resultado)
+
+        self._correction_cache: Dict[Tuple[bytes, str], Tuple[str, List[str], bool]] = {}
+
+        # Deteta indentações que não são múltiplas de tab_size (modo espaços)
+
+        if use_spaces and tab_size > 1:
+
+            self._odd_indent_re = re.compile(
+
+                rb'(?m)^(?: {%d})* {1,%d}(?! )' % (tab_size, tab_size - 1)
+
+            )
+
+        else:
+
+            self._odd_indent_re = None
+
         
 
     def is_python_file(self, file_path: Path) -> bool:
@@ -118,13 +182,13 @@ class IndentationCorrector:
 
         Detecta o estilo de indentação atual do código
 
-        
+
 
         Args:
 
             content: Conteúdo do ficheiro
 
-            
+
 
         Returns:
 
@@ -136,35 +200,27 @@ class IndentationCorrector:
 
         tab_count = 0
 
-        
-
-        lines = content.split('\n')
-
-        
 
-        for line in lines:
 
-            if not line.strip():  # Pular linhas vazias
+        # Um único varrimento em C extrai os prefixos de indentação das
 
-                continue
+        # linhas com conteúdo; linhas vazias ou sem indentação nem sequer
 
-                
+        # chegam ao loop Python
 
-            # Contar espaços no início
+        for prefix in _DETECT_INDENT_RE.findall(content):
 
-            leading_spaces = len(line) - len(line.lstrip(' '))
+            if prefix[0] == '\t':
 
-            # Verificar se há tabs
+                tab_count += 1
 
-            if line.startswith('\t'):
+            else:
 
-                tab_count += 1
+                # Comprimento do primeiro bloco de espaços, num scan em C
 
-            elif leading_spaces > 0:
+                space_indents.append(len(prefix) - len(prefix.lstrip(' ')))
 
-                space_indents.append(leading_spaces)
 
-        
 
         # Se há mais tabs que espaços, usar tabs
 
@@ -178,19 +234,11 @@ class IndentationCorrector:
 
         if space_indents:
 
-            # Encontrar o GCD dos tamanhos de indentação
-
-            from math import gcd
-
-            indent_size = space_indents[0]
+            # GCD variádico em C sobre os tamanhos únicos (tipicamente 1-3)
 
-            for size in space_indents[1:]:
+            indent_size = gcd(*set(space_indents))
 
-                if size > 0:
 
-                    indent_size = gcd(indent_size, size)
-
-            
 
             # Valores comuns: 2, 4, 8
 
@@ -228,19 +276,35 @@ class IndentationCorrector:
 
         """
 
+        key = hash(content)
+
+        cached = self._syntax_cache.get(key)
+
+        if cached is not None:
+
+            return cached
+
+
+
         try:
 
             ast.parse(content)
 
-            return True, None
+            result = (True, None)
 
         except SyntaxError as e:
 
-            return False, f"Erro de sintaxe na linha {e.lineno}: {e.msg}"
+            result = (False, f"Erro de sintaxe na linha {e.lineno}: {e.msg}")
 
         except Exception as e:
 
-            return False, f"Erro de validação: {str(e)}"
+            result = (False, f"Erro de validação: {str(e)}")
+
+
+
+        self._syntax_cache[key] = result
+
+        return result
 
     
 
@@ -264,95 +328,105 @@ class IndentationCorrector:
 
         """
 
-        lines = content.split('\n')
+        # Todo o caminho quente opera sobre o buffer UTF-8: um encode à
 
-        corrected_lines = []
+        # entrada, um decode à saída, e ops em bytes (sem kind-checks de
 
-        
+        # Unicode) pelo meio - seguro porque espaços/tabs/newlines nunca
 
-        for line in lines:
+        # ocorrem em bytes de continuação UTF-8
 
-            if not line.strip():  # Preservar linhas vazias
+        buf = content.encode('utf-8')
 
-                corrected_lines.append('')
 
-                continue
 
-                
+        # Caminho rápido: ficheiro sem tabs, sem linhas só de espaços e com
 
-            # Contar nível de indentação atual
+        # todas as indentações múltiplas do tab_size já está canónico
 
-            original_line = line
+        if (self._odd_indent_re is not None
 
-            stripped = line.lstrip()
+                and b'\t' not in buf
 
-            
+                and _WS_ONLY_LINE_RE.search(buf) is None
 
-            if not stripped:  # Linha só com espaços/tabs
+                and self._odd_indent_re.search(buf) is None):
 
-                corrected_lines.append('')
+            return content
 
-                continue
 
-            
 
-            # Calcular nível de indentação
+        tab_size = self.tab_size
 
-            indent_level = 0
+        indent_unit = self._indent_unit_b
 
-            i = 0
+        indent_cache = self._indent_cache
 
-            while i < len(line):
 
-                if line[i] == ' ':
 
-                    indent_level += 1
+        def _reindent(match):
 
-                elif line[i] == '\t':
+            # Linha só com espaços/tabs fica vazia
 
-                    # Tab conta como múltiplo do tab_size
+            end = match.end()
 
-                    indent_level += self.tab_size
+            if match.string[end:end + 1] in (b'', b'\n'):
 
-                else:
+                return b''
 
-                    break
 
-                i += 1
 
-            
+            # Tab conta como múltiplo do tab_size
 
-            # Normalizar para unidades de indentação
+            prefix = match.group(0)
 
-            indent_units = indent_level // self.tab_size
+            indent_level = prefix.count(b' ') + prefix.count(b'\t') * tab_size
 
-            
 
-            # Reconstruir linha com indentação correta
 
-            new_line = self.indent_unit * indent_units + stripped
+            # Normalizar para unidades de indentação (tabela para níveis comuns)
 
-            corrected_lines.append(new_line)
+            indent_units = indent_level // tab_size
 
-        
+            if indent_units < 32:
 
-        return '\n'.join(corrected_lines)
+                return indent_cache[indent_units]
+
+            return indent_unit * indent_units
+
+
+
+        # Uma única passagem em C sobre o buffer: linhas sem indentação
+
+        # nem sequer chegam ao Python
+
+        result = _INDENT_RUN_RE.sub(_reindent, buf)
+
+        if result == buf:
+
+            return content
+
+        return result.decode('utf-8')
 
     
 
-    def fix_indentation_errors(self, content: str) -> Tuple[str, List[str]]:
+    def fix_indentation_errors(self, content: str, syntax_valid: Optional[bool] = None) -> Tuple[str, List[str]]:
 
         """
 
         Corrige erros de indentação usando tokenizer
 
-        
+
 
         Args:
 
             content: Conteúdo original
 
-            
+            syntax_valid: Resultado de uma validação ast.parse já feita pelo
+
+                chamador; se True, o tokenizer é dispensado (o parse inclui-o)
+
+
 
         Returns:
 
@@ -362,15 +436,19 @@ class IndentationCorrector:
 
         warnings = []
 
-        
+
 
         try:
 
             # Usar tokenizer para detectar problemas de indentação
 
-            tokens = list(tokenize.generate_tokens(StringIO(content).readline))
+            # (desnecessário se o ast.parse do chamador já passou)
+
+            if syntax_valid is not True:
+
+                tokens = list(tokenize.generate_tokens(StringIO(content).readline))
+
 
-            
 
             # Se chegou até aqui, a indentação está sintaticamente correta
 
@@ -408,19 +486,25 @@ class IndentationCorrector:
 
     
 
-    def analyze_indentation_issues(self, content: str) -> Dict[str, any]:
+    def analyze_indentation_issues(self, content, lines: Optional[List[str]] = None, ranges: Optional[List[Tuple[int, int]]] = None) -> Dict[str, any]:
 
         """
 
         Analisa problemas de indentação no código
 
-        
+
 
         Args:
 
-            content: Conteúdo do código
+            content: Conteúdo do código (string ou lista de linhas)
+
+            lines: Linhas já separadas (evita novo split quando o chamador já as tem)
+
+            ranges: Regiões (início, fim) alteradas pelo patch; se nenhuma
+
+                    linha alterada tem indentação, a análise completa é saltada
+
 
-            
 
         Returns:
 
@@ -428,7 +512,45 @@ class IndentationCorrector:
 
         """
 
-        lines = content.split('\n')
+        if lines is None:
+
+            lines = content.split('\n') if isinstance(content, str) else content
+
+        # Pré-filtro: se o patch não tocou em nenhuma linha indentada, o
+
+        # ficheiro não precisa de correção por causa desta aplicação
+
+        if ranges is not None:
+
+            total = len(lines)
+
+            touched_indent = any(
+
+                lines[i][:1] in (' ', '\t')
+
+                for start, end in ranges
+
+                for i in range(start, min(end, total))
+
+            )
+
+            if not touched_indent:
+
+                return {
+
+                    'has_tabs': False,
+
+                    'has_spaces': False,
+
+                    'mixed_lines': [],
+
+                    'inconsistent_spacing': [],
+
+                    'total_lines': total,
+
+                    'indented_lines': 0
+
+                }
 
         analysis = {
 
@@ -462,19 +584,25 @@ class IndentationCorrector:
 
             analysis['indented_lines'] += 1
 
-            
+
+
+            # Extrair o prefixo de indentação uma única vez por linha
+
+            indent_part = _LEADING_WS_RE.match(line).group(0)
+
+
 
             # Detectar tabs
 
-            if '\t' in line[:len(line) - len(line.lstrip())]:
+            if '\t' in indent_part:
 
                 analysis['has_tabs'] = True
 
-                
+
 
             # Detectar espaços
 
-            leading_spaces = len(line) - len(line.lstrip(' '))
+            leading_spaces = len(indent_part) - len(indent_part.lstrip(' '))
 
             if leading_spaces > 0:
 
@@ -482,11 +610,9 @@ class IndentationCorrector:
 
                 space_patterns.add(leading_spaces)
 
-                
 
-            # Detectar mistura na mesma linha
 
-            indent_part = line[:len(line) - len(line.lstrip())]
+            # Detectar mistura na mesma linha
 
             if '\t' in indent_part and ' ' in indent_part:
 
@@ -518,21 +644,21 @@ class IndentationCorrector:
 
     
 
-    def correct_file_indentation(self, content: str, file_path: Path) -> Tuple[str, List[str], bool]:
+    def correct_file_indentation(self, content, file_path: Path) -> Tuple[str, List[str], bool]:
 
         """
 
         Corrige indentação de um ficheiro Python
 
-        
+
 
         Args:
 
-            content: Conteúdo original
+            content: Conteúdo original (string ou lista de linhas)
 
             file_path: Caminho do ficheiro (para detecção de tipo)
 
-            
+
 
         Returns:
 
@@ -540,9 +666,39 @@ class IndentationCorrector:
 
         """
 
+        # O pipeline circula listas de linhas; juntar uma única vez aqui
+
+        if not isinstance(content, str):
+
+            content = ''.join(content)
+
+
+
         warnings = []
 
-        
+
+
+        # Memoização por conteúdo: repetir a correção do mesmo ficheiro na
+
+        # mesma sessão devolve o resultado sem novo parse (limitado a 1 MiB)
+
+        cache_key = None
+
+        if len(content) <= (1 << 20):
+
+            digest = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+            cache_key = (digest, str(file_path))
+
+            cached = self._correction_cache.get(cache_key)
+
+            if cached is not None:
+
+                corrected, cached_warnings, was_modified = cached
+
+                return corrected, list(cached_warnings), was_modified
+
+
 
         # Verificar se é ficheiro Python
 
@@ -550,7 +706,7 @@ class IndentationCorrector:
 
             return content, ["File is not Python - indentation not corrected"], False
 
-        
+
 
         # Validar sintaxe original
 
@@ -588,9 +744,9 @@ class IndentationCorrector:
 
         
 
-        # Aplicar correções
+        # Aplicar correções (reutiliza o resultado do ast.parse acima)
 
-        corrected_content, fix_warnings = self.fix_indentation_errors(content)
+        corrected_content, fix_warnings = self.fix_indentation_errors(content, syntax_valid=is_valid)
 
         warnings.extend(fix_warnings)
 
@@ -614,9 +770,21 @@ class IndentationCorrector:
 
                 # Em caso de erro, retornar original
 
-                return content, warnings + ["Correction reverted due to errors"], False
+                reverted_warnings = warnings + ["Correction reverted due to errors"]
+
+                if cache_key is not None:
+
+                    self._correction_cache[cache_key] = (content, list(reverted_warnings), False)
+
+                return content, reverted_warnings, False
+
+
+
+        if cache_key is not None:
+
+            self._correction_cache[cache_key] = (corrected_content, list(warnings), was_modified)
+
 
-        
 
         return corrected_content, warnings, was_modified
 
@@ -8,10 +8,16 @@ Responsável por leitura/escrita de ficheiros e criação de backups
 
 
 
+import mmap
+
 import os
 
 import shutil
 
+import stat
+
+import sys
+
 from pathlib import Path
 
 from datetime import datetime
@@ -50,29 +56,19 @@ class IOHandler:
 
         try:
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-
-                # Preservar terminações de linha originais
+            # Uma única passagem em C sobre o ficheiro: o iterador de linhas
 
-                content = f.read()
+            # já preserva os terminadores (normalizados para '\n', como
 
-                lines = content.splitlines(keepends=True)
+            # antes) e a última linha fica naturalmente sem '\n' se o
 
-                
+            # ficheiro não terminar com um
 
-                # Se o ficheiro não termina com newline, a última linha não terá
+            with open(file_path, 'r', encoding='utf-8', buffering=1 << 20) as f:
 
-                if content and not content.endswith('\n'):
+                return list(f)
 
-                    if lines:
 
-                        lines[-1] = lines[-1].rstrip('\n')
-
-                
-
-                return lines
-
-                
 
         except FileNotFoundError:
 
@@ -124,11 +120,53 @@ class IOHandler:
 
         try:
 
-            with open(file_path, 'w', encoding='utf-8') as f:
+            # Entregar o conteúdo inteiro numa única escrita em C: o SO
+
+            # coalesce tudo em 1-2 syscalls em vez de uma por linha.
+
+            # O contrato é fixo (lista de linhas), sem fence de tipo
+
+            data = ''.join(content)
+
+            # Escrever num temporário e instalar com os.replace: o rename é
+
+            # atómico, o ficheiro original nunca fica meio escrito e o novo
+
+            # conteúdo ocupa um inode novo (preservando backups por hardlink)
+
+            tmp_path = file_path.with_suffix(file_path.suffix + '.tmp')
+
+            try:
 
-                for line in content:
+                with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 20, newline='') as f:
 
-                    f.write(line)
+                    f.write(data)
+
+                    # Durabilidade: garantir que o conteúdo chega ao disco
+
+                    # antes de o instalar e reportar sucesso
+
+                    f.flush()
+
+                    os.fsync(f.fileno())
+
+                # Manter as permissões do ficheiro original no inode novo
+
+                try:
+
+                    os.chmod(tmp_path, os.stat(file_path).st_mode)
+
+                except OSError:
+
+                    pass
+
+                os.replace(tmp_path, file_path)
+
+            except BaseException:
+
+                tmp_path.unlink(missing_ok=True)
+
+                raise
 
             return True
 
@@ -176,13 +214,25 @@ class IOHandler:
 
             backup_path = file_path.parent / backup_name
 
-            
 
-            shutil.copy2(file_path, backup_path)
+
+            # Hardlink primeiro: snapshot O(1) sem duplicar dados, seguro
+
+            # porque a escrita instala o novo conteúdo num inode novo
+
+            try:
+
+                os.link(file_path, backup_path)
+
+            except OSError:
+
+                # Sem suporte (EXDEV, FAT, ...) ou backup já existente - copiar
+
+                self._copy_file(file_path, backup_path)
 
             return backup_path
 
-            
+
 
         except Exception as e:
 
@@ -190,6 +240,60 @@ class IOHandler:
 
             return None
 
+
+
+    def _copy_file(self, src: Path, dst: Path) -> None:
+
+        """Copia src para dst preservando metadados
+
+
+
+        Em Linux usa os.copy_file_range: a cópia é feita no kernel, sem
+
+        buffers em user-space, e em btrfs/XFS degenera num reflink (COW)
+
+        praticamente gratuito. Noutras plataformas cai em shutil.copyfile.
+
+        """
+
+        if hasattr(os, 'copy_file_range'):
+
+            try:
+
+                src_fd = os.open(src, os.O_RDONLY)
+
+                try:
+
+                    dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+
+                    try:
+
+                        while os.copy_file_range(src_fd, dst_fd, 1 << 30):
+
+                            pass
+
+                    finally:
+
+                        os.close(dst_fd)
+
+                finally:
+
+                    os.close(src_fd)
+
+            except OSError:
+
+                # Sistemas de ficheiros sem suporte (EXDEV/EINVAL) - cópia normal
+
+                shutil.copyfile(src, dst)
+
+        else:
+
+            shutil.copyfile(src, dst)
+
+
+
+        shutil.copystat(src, dst)
+
     
 
     def read_patch_from_stdin(self) -> str:
@@ -208,29 +312,17 @@ class IOHandler:
 
         print("Paste the patch below (finish input with Ctrl+D):")
 
-        lines = []
-
-        
-
-        try:
-
-            while True:
-
-                line = input()
 
-                lines.append(line)
 
-        except EOFError:
+        # Ler tudo até EOF num único loop em C, sempre pela camada de texto:
 
-            pass  # Ctrl+D or EOF
+        # os prompts anteriores (input()/readline()) também a usam e o
 
-        except KeyboardInterrupt:
+        # TextIOWrapper pode já ter bytes do patch no seu buffer interno -
 
-            raise
-
-        
+        # ler sys.stdin.buffer diretamente perderia esses bytes
 
-        return '\n'.join(lines)
+        return sys.stdin.read()
 
     
 
@@ -256,23 +348,29 @@ class IOHandler:
 
         try:
 
-            diff_files = []
+            # os.scandir usa o d_type devolvido pelo readdir: nenhum stat
 
-            for file_path in directory.glob('*.diff'):
+            # extra por entrada, ao contrário do glob + is_file
 
-                if file_path.is_file():
+            with os.scandir(directory) as entries:
+
+                diff_files = [
+
+                    entry for entry in entries
+
+                    if entry.name.endswith('.diff') and entry.is_file()
+
+                ]
 
-                    diff_files.append(file_path)
 
-            
 
             # Ordenar por nome
 
-            diff_files.sort(key=lambda x: x.name.lower())
+            diff_files.sort(key=lambda entry: entry.name.lower())
+
+            return [Path(entry.path) for entry in diff_files]
 
-            return diff_files
 
-            
 
         except Exception as e:
 
@@ -304,39 +402,49 @@ class IOHandler:
 
         try:
 
-            with open(patch_path, 'r', encoding='utf-8') as f:
+            # Mapear o ficheiro e descodificar diretamente do mapa: o str()
 
-                return f.read()
+            # lê do buffer partilhado com o page cache, sem cópia intermédia
 
-                
+            fd = os.open(patch_path, os.O_RDONLY)
 
-        except FileNotFoundError:
+            try:
 
-            print(f"Error: Patch file not found: {patch_path}")
+                size = os.fstat(fd).st_size
 
-            return None
+                if size == 0:
 
-        except PermissionError:
+                    return ''
 
-            print(f"Error: Permission denied: {patch_path}")
+                with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mm:
 
-            return None
+                    try:
 
-        except UnicodeDecodeError:
+                        return str(mm, 'utf-8')
 
-            try:
+                    except UnicodeDecodeError:
 
-                # Tentar com outras codificações
+                        # Tentar com outras codificações
 
-                with open(patch_path, 'r', encoding='latin-1') as f:
+                        return str(mm, 'latin-1')
 
-                    return f.read()
+            finally:
 
-            except Exception:
+                os.close(fd)
 
-                print(f"Error: Encoding issue in file: {patch_path}")
 
-                return None
+
+        except FileNotFoundError:
+
+            print(f"Error: Patch file not found: {patch_path}")
+
+            return None
+
+        except PermissionError:
+
+            print(f"Error: Permission denied: {patch_path}")
+
+            return None
 
         except Exception as e:
 
@@ -366,9 +474,9 @@ class IOHandler:
 
         """
 
-        # Remover aspas se presentes
+        # Remover espaços e aspas das pontas num único scan em C
 
-        path_str = path_str.strip().strip('"').strip("'")
+        path_str = path_str.strip(' \t\r\n"\'')
 
         
 
@@ -382,31 +490,33 @@ class IOHandler:
 
             path = Path(path_str).resolve()
 
-            
 
-            if not path.exists():
+
+            # Um único stat responde a exists/is_dir/is_file de uma vez
+
+            try:
+
+                st = os.stat(path)
+
+            except FileNotFoundError:
 
                 print(f"Error: File does not exist: {path}")
 
                 return None
 
-            
 
-            if path.is_dir():
+
+            if stat.S_ISDIR(st.st_mode) or stat.S_ISREG(st.st_mode):
 
                 return path
 
-            if not path.is_file():
 
-                print(f"Error: Path is not a valid file or directory: {path}")
 
-                return None
+            print(f"Error: Path is not a valid file or directory: {path}")
 
-            
+            return None
 
-            return path
 
-            
 
         except Exception as e:
 
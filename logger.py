@@ -8,8 +8,12 @@ Registra eventos detalhados com timestamps
 
 
 
+import atexit
+
 import os
 
+import time
+
 from datetime import datetime
 
 from pathlib import Path
@@ -20,6 +24,14 @@ from typing import Optional
 
 
 
+# Linha separadora reutilizada no cabeçalho e no rodapé
+
+_SEP_LINE = "=" * 80 + "\n"
+
+
+
+
+
 class PatchLogger:
 
     """Classe para logging de eventos do aplicador de patches"""
@@ -60,47 +72,85 @@ class PatchLogger:
 
 
 
-        # Buffer logs in memory until user confirms save
+        # Handle persistente: um único open por sessão em vez de um
 
-        self.buffer = []
+        # open/close por evento
 
-        header = "=" * 80 + "\nPATCH APPLIER LOG\n" + "=" * 80 + "\n"
+        header = ''.join([
 
-        header += f"Session started: {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            _SEP_LINE,
 
-        header += f"Working directory: {os.getcwd()}\nLog file: {self.log_file.absolute()}\n"
+            "PATCH APPLIER LOG\n",
 
-        header += "=" * 80 + "\n\n"
+            _SEP_LINE,
 
-        self.buffer.append(header)
+            f"Session started: {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}\n",
 
+            f"Working directory: {os.getcwd()}\nLog file: {self.log_file.absolute()}\n",
 
+            _SEP_LINE,
+
+            "\n",
+
+        ])
 
-    def _write_header(self) -> None:
 
-        """Escreve cabeçalho do log"""
 
         try:
 
-            with open(self.log_file, 'w', encoding='utf-8') as f:
+            self._fh = open(self.log_file, 'w', encoding='utf-8', buffering=8192)
+
+            self._fh.write(header)
+
+        except Exception as e:
 
-                f.write("=" * 80 + "\n")
+            print(f"Warning: Could not initialize log file: {e}")
 
-                f.write("PATCH APPLIER LOG\n")
+            self._fh = None
 
-                f.write("=" * 80 + "\n")
 
-                f.write(f"Session started: {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}\n")
 
-                f.write(f"Working directory: {os.getcwd()}\n")
+        # Prefixo de timestamp formatado uma vez por segundo e reutilizado
 
-                f.write(f"Log file: {self.log_file.absolute()}\n")
+        self._last_sec = 0
 
-                f.write("=" * 80 + "\n\n")
+        self._last_sec_str = ''
 
-        except Exception as e:
 
-            print(f"Warning: Could not initialize log file: {e}")
+
+        # Garantir o rodapé na saída do interpretador, de forma determinista
+
+        # (ao contrário de __del__, o atexit corre antes do teardown)
+
+        self._finalized = False
+
+        atexit.register(self.finalize_log)
+
+
+
+    def _timestamp(self) -> str:
+
+        """Timestamp 'YYYY-mm-dd HH:MM:SS.mmm' com strftime amortizado
+
+
+
+        O strftime só corre quando o segundo muda; dentro do mesmo segundo
+
+        apenas os milissegundos são recalculados.
+
+        """
+
+        now = time.time()
+
+        sec = int(now)
+
+        if sec != self._last_sec:
+
+            self._last_sec = sec
+
+            self._last_sec_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sec))
+
+        return f"{self._last_sec_str}.{int((now - sec) * 1000):03d}"
 
 
 
@@ -122,31 +172,53 @@ class PatchLogger:
 
         """
 
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        timestamp = self._timestamp()
 
 
 
         try:
 
-            with open(self.log_file, 'a', encoding='utf-8') as f:
+            fh = self._fh
+
+            if fh is None:
+
+                return
+
+            if fh.closed:
+
+                # Evento após finalize - voltar a anexar ao mesmo ficheiro
+
+                fh = self._fh = open(self.log_file, 'a', encoding='utf-8', buffering=8192)
+
+                self._finalized = False
+
+
+
+            # Montar o evento completo e entregá-lo numa única escrita
+
+            parts = [f"[{timestamp}] {event_type}: {message}\n"]
+
+
 
-                f.write(f"[{timestamp}] {event_type}: {message}\n")
+            if details:
 
+                # Indentar detalhes
 
+                parts.extend(f"    {line}\n" for line in details.split('\n'))
 
-                if details:
 
-                    # Indentar detalhes
 
-                    detail_lines = details.split('\n')
+            parts.append("\n")  # Linha em branco entre eventos
 
-                    for line in detail_lines:
+            fh.write(''.join(parts))
 
-                        f.write(f"    {line}\n")
 
 
+            # Erros devem sobreviver a um crash - forçar flush só nesses
 
-                f.write("\n")  # Linha em branco entre eventos
+            if event_type == "ERROR":
+
+                fh.flush()
 
 
 
@@ -358,7 +430,15 @@ class PatchLogger:
 
     def finalize_log(self) -> None:
 
-        """Finaliza o log com informações de sessão"""
+        """Finaliza o log com informações de sessão (idempotente)"""
+
+        if self._finalized:
+
+            return
+
+        self._finalized = True
+
+
 
         session_end = datetime.now()
 
@@ -368,44 +448,42 @@ class PatchLogger:
 
         try:
 
-            with open(self.log_file, 'a', encoding='utf-8') as f:
+            fh = self._fh
 
-                f.write("=" * 80 + "\n")
+            if fh is None or fh.closed:
 
-                f.write("SESSION ENDED\n")
+                return
 
-                f.write("=" * 80 + "\n")
 
-                f.write(f"End time: {session_end.strftime('%Y-%m-%d %H:%M:%S')}\n")
 
-                f.write(f"Duration: {duration}\n")
+            fh.write(''.join([
 
-                f.write("=" * 80 + "\n")
+                _SEP_LINE,
 
+                "SESSION ENDED\n",
 
+                _SEP_LINE,
 
-        except Exception as e:
-
-            print(f"Warning: Could not finalize log file: {e}")
+                f"End time: {session_end.strftime('%Y-%m-%d %H:%M:%S')}\n",
 
+                f"Duration: {duration}\n",
 
+                _SEP_LINE,
 
-    def get_log_path(self) -> Path:
+            ]))
 
-        """Retorna caminho do ficheiro de log"""
+            fh.close()
 
-        return self.log_file
 
 
+        except Exception as e:
 
-    def __del__(self):
+            print(f"Warning: Could not finalize log file: {e}")
 
-        """Destructor - finaliza log quando objeto é destruído"""
 
-        try:
 
-            self.finalize_log()
+    def get_log_path(self) -> Path:
 
-        except:
+        """Retorna caminho do ficheiro de log"""
 
-            pass  # Ignorar erros no destructor
\ No newline at end of file
+        return self.log_file
\ No newline at end of file
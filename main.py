@@ -7,36 +7,67 @@ Com correção automática de indentação para ficheiros Python
 
 import sys
 import argparse
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
 
-from io_handler import IOHandler
-from parser_handler import PatchParser
-from applier import PatchApplier
-from ui import UserInterface
-from logger import PatchLogger
-from indentation_corrector import IndentationCorrector
-
 
 class PatchApplication:
     """Classe principal para orquestrar a aplicação de patches"""
-    
+
     def __init__(self, context_lines=3, revert=False, fix_indentation=True, tab_size=4, use_spaces=True):
+        # Imports adiados para aqui: caminhos de saída rápida (--help,
+        # argumentos inválidos) não pagam o arranque de ast/tokenize/re
+        # que estes módulos arrastam
+        from io_handler import IOHandler
+        from parser_handler import PatchParser
+        from applier import PatchApplier
+        from ui import UserInterface
+        from logger import PatchLogger
+
         self.context_lines = context_lines
         self.revert = revert
         self.fix_indentation = fix_indentation
+        self.tab_size = tab_size
+        self.use_spaces = use_spaces
         self.io_handler = IOHandler()
         self.parser = PatchParser()
         self.applier = PatchApplier(context_lines=context_lines, revert=revert)
-        self.ui = UserInterface()
         self.logger = PatchLogger()
-        self.indentation_corrector = IndentationCorrector(tab_size=tab_size, use_spaces=use_spaces)
-        
+        # Partilhar o logger com a UI: instâncias separadas abririam o
+        # mesmo ficheiro em 'w' e perder-se-iam eventos
+        self.ui = UserInterface(logger=self.logger)
+        self._indentation_corrector = None
+
+    @property
+    def indentation_corrector(self):
+        """Corretor construído (e o módulo importado) apenas quando a
+        correção de indentação é de facto atingida no fluxo"""
+        if self._indentation_corrector is None:
+            from indentation_corrector import IndentationCorrector
+            self._indentation_corrector = IndentationCorrector(tab_size=self.tab_size, use_spaces=self.use_spaces)
+        return self._indentation_corrector
+
+    def _looks_like_python(self, file_path, content):
+        """Pré-filtro barato para a análise de indentação: decide pela
+        extensão ou pelo shebang do conteúdo já em memória (lista de
+        linhas), sem voltar a ler o ficheiro do disco nem percorrê-lo
+        quando claramente não é Python"""
+        if file_path.suffix.lower() in ('.py', '.pyw'):
+            return True
+        first_line = content[0] if content else ''
+        return first_line.startswith('#!') and 'python' in first_line.lower()
+
     def run(self):
         """Executa o fluxo principal da aplicação"""
+        # Ligações locais para o loop por ficheiro: cada self.x.y custa
+        # dois LOAD_ATTR por uso e estes são usados dezenas de vezes
+        ui = self.ui
+        io_handler = self.io_handler
+        log_event = self.logger.log_event
         try:
             # 1. Leitura do ficheiro-alvo
-            target_file = self.ui.get_target_file()
+            target_file = ui.get_target_file()
             if not target_file:
                 return 1
                 
@@ -44,177 +75,193 @@ class PatchApplication:
                 root_dir = target_file
             else:
                 root_dir = target_file.parent
-                original_content = self.io_handler.read_target_file(target_file)
+                original_content = io_handler.read_target_file(target_file)
                 if original_content is None:
-                    self.ui.show_error(f"Erro ao ler o ficheiro: {target_file}")
+                    ui.show_error(f"Erro ao ler o ficheiro: {target_file}")
                     return 1
-                self.logger.log_event("FILE_READ", f"Ficheiro lido: {target_file}")
+                log_event("FILE_READ", f"Ficheiro lido: {target_file}")
             
             # 2. Leitura do patch
-            patch_content = self.ui.get_patch_content(root_dir)
+            patch_content = ui.get_patch_content(root_dir)
             if not patch_content:
                 return 1
                 
             # 3. Parsing dos hunks
             hunks = self.parser.parse_patch(patch_content)
             if not hunks:
-                self.ui.show_error("Nenhum hunk válido encontrado no patch")
+                ui.show_error("Nenhum hunk válido encontrado no patch")
                 return 1
                 
-            self.logger.log_event("PATCH_PARSED", f"Encontrados {len(hunks)} hunks")
+            log_event("PATCH_PARSED", f"Encontrados {len(hunks)} hunks")
             
             # 4. Aplicação dos hunks
             if target_file.is_dir():
                 results = {'applied': 0, 'failed': 0, 'warnings': []}
                 indentation_warnings_all = []
-                file_hunks = {}
+                # defaultdict evita o lookup do setdefault por hunk
+                file_hunks = defaultdict(list)
                 for hunk in hunks:
                     file_path = hunk.file_path
                     if not file_path:
-                        self.ui.show_error("Patch inválido: falta caminho de ficheiro para hunk.")
+                        ui.show_error("Patch inválido: falta caminho de ficheiro para hunk.")
                         return 1
-                    file_hunks.setdefault(file_path, []).append(hunk)
+                    file_hunks[file_path].append(hunk)
                 updated_contents = {}
-                for file_rel, hunks_list in file_hunks.items():
+                # Fase de leitura em paralelo: as leituras são independentes
+                # e libertam o GIL, por isso threads sobrepõem o I/O dos N
+                # ficheiros; a aplicação continua serial (interage com a UI)
+                from concurrent.futures import ThreadPoolExecutor
+                file_items = list(file_hunks.items())
+                with ThreadPoolExecutor(max_workers=min(32, len(file_items))) as pool:
+                    contents = list(pool.map(
+                        lambda item: io_handler.read_target_file(root_dir / item[0]),
+                        file_items
+                    ))
+                for (file_rel, hunks_list), original_content_file in zip(file_items, contents):
                     file_path = root_dir / file_rel
-                    original_content_file = self.io_handler.read_target_file(file_path)
                     if original_content_file is None:
-                        self.ui.show_error(f"Erro ao ler o ficheiro: {file_path}")
+                        ui.show_error(f"Erro ao ler o ficheiro: {file_path}")
                         results['failed'] += len(hunks_list)
                         results['warnings'].append(f"Ficheiro não encontrado ou inacessível: {file_rel}")
                         continue
-                    self.ui.show_info(f"Aplicando patch no ficheiro: {file_path}")
-                    modified_content_file, res_file = self.applier.apply_hunks(original_content_file, hunks_list, self.ui)
-                    # Garantir que modified_content_file é string para análise de indentação
-                    if isinstance(modified_content_file, list):
-                        modified_content_file = "\n".join(modified_content_file)
+                    ui.show_info(f"Aplicando patch no ficheiro: {file_path}")
+                    modified_content_file, res_file = self.applier.apply_hunks(original_content_file, hunks_list, ui)
                     results['applied'] += res_file.get('applied', 0)
                     results['failed'] += res_file.get('failed', 0)
+                    # Avisos guardados como (ficheiro, mensagem); a formatação
+                    # só acontece no resumo, se este for mostrado
                     for w in res_file.get('warnings', []):
-                        results['warnings'].append(f"{file_rel}: {w}")
+                        results['warnings'].append((file_rel, w))
                     file_indent_warnings = []
                     if self.fix_indentation and res_file.get('applied', 0) > 0:
-                        if self.indentation_corrector.is_python_file(file_path):
-                            self.ui.show_info("🐍 Ficheiro Python detectado - verificando indentação...")
-                            analysis = self.indentation_corrector.analyze_indentation_issues(modified_content_file)
-                            analysis_summary = self.indentation_corrector.get_correction_summary(analysis)
+                        if self._looks_like_python(file_path, modified_content_file):
+                            ui.show_info("🐍 Ficheiro Python detectado - verificando indentação...")
+                            corrector = self.indentation_corrector
+                            analysis = corrector.analyze_indentation_issues(modified_content_file, ranges=res_file.get('changed_ranges'))
+                            analysis_summary = corrector.get_correction_summary(analysis)
                             if (analysis['has_tabs'] and analysis['has_spaces']) or analysis['mixed_lines'] or analysis['inconsistent_spacing']:
-                                self.ui.show_info("Problemas de indentação detectados:")
+                                ui.show_info("Problemas de indentação detectados:")
                                 print(analysis_summary)
-                                if self.ui.confirm_indentation_fix():
-                                    corrected_content_file, warnings_file, was_modified_file = self.indentation_corrector.correct_file_indentation(modified_content_file, file_path)
+                                if ui.confirm_indentation_fix():
+                                    corrected_content_file, warnings_file, was_modified_file = corrector.correct_file_indentation(modified_content_file, file_path)
                                     if was_modified_file:
-                                        modified_content_file = corrected_content_file
+                                        modified_content_file = corrected_content_file.splitlines(keepends=True)
                                         file_indent_warnings = warnings_file
-                                        self.ui.show_success("✅ Indentação corrigida")
-                                        self.logger.log_event("INDENTATION_CORRECTED", f"{file_rel}: Avisos: {'; '.join(warnings_file)}")
+                                        ui.show_success("✅ Indentação corrigida")
+                                        log_event("INDENTATION_CORRECTED", f"{file_rel}: Avisos: {'; '.join(warnings_file)}")
                                     else:
                                         if warnings_file:
-                                            self.ui.show_warning(f"Correção de indentação falhou no ficheiro {file_rel} - veja avisos.")
+                                            ui.show_warning(f"Correção de indentação falhou no ficheiro {file_rel} - veja avisos.")
                                             file_indent_warnings.extend(warnings_file)
                                         else:
-                                            self.ui.show_info("Nenhuma correção de indentação necessária")
+                                            ui.show_info("Nenhuma correção de indentação necessária")
                                 else:
-                                    self.ui.show_info("Correção de indentação ignorada")
+                                    ui.show_info("Correção de indentação ignorada")
                             else:
-                                self.ui.show_success("✅ Indentação já está consistente")
-                                self.logger.log_event("INDENTATION_CHECK", f"{file_rel}: Indentação consistente")
+                                ui.show_success("✅ Indentação já está consistente")
+                                log_event("INDENTATION_CHECK", f"{file_rel}: Indentação consistente")
                     for w in file_indent_warnings:
-                        indentation_warnings_all.append(f"{file_rel}: {w}")
+                        indentation_warnings_all.append((file_rel, w))
                     updated_contents[file_path] = modified_content_file
-                self.ui.show_summary(results, indentation_warnings_all)
+                ui.show_summary(results, indentation_warnings_all)
                 if results['applied'] > 0:
-                    if self.ui.confirm_save():
-                        for path, content in updated_contents.items():
-                            backup_path = self.io_handler.create_backup(path)
-                            if backup_path:
-                                self.logger.log_event("BACKUP_CREATED", str(backup_path))
-                            if self.io_handler.write_target_file(path, content):
-                                self.ui.show_success(f"Ficheiro atualizado: {path}")
-                                self.logger.log_event("FILE_SAVED", str(path))
-                            else:
-                                self.ui.show_error(f"Erro ao gravar o ficheiro: {path}")
-                                return 1
+                    if ui.confirm_save():
+                        # Backups e escritas por ficheiro são independentes:
+                        # correm em paralelo, com o reporte em ordem estável
+                        def _save_file(item):
+                            path, content = item
+                            backup_path = io_handler.create_backup(path)
+                            return path, backup_path, io_handler.write_target_file(path, content)
+
+                        save_items = list(updated_contents.items())
+                        with ThreadPoolExecutor(max_workers=min(32, len(save_items))) as pool:
+                            for path, backup_path, saved in pool.map(_save_file, save_items):
+                                if backup_path:
+                                    log_event("BACKUP_CREATED", str(backup_path))
+                                if saved:
+                                    ui.show_success(f"Ficheiro atualizado: {path}")
+                                    log_event("FILE_SAVED", str(path))
+                                else:
+                                    ui.show_error(f"Erro ao gravar o ficheiro: {path}")
+                                    return 1
                     else:
-                        self.ui.show_info("Alterações descartadas")
-                        self.logger.log_event("CHANGES_DISCARDED", "")
+                        ui.show_info("Alterações descartadas")
+                        log_event("CHANGES_DISCARDED", "")
                 else:
-                    self.ui.show_info("Nenhuma alteração foi aplicada")
+                    ui.show_info("Nenhuma alteração foi aplicada")
                 return 0
             else:
                 modified_content, results = self.applier.apply_hunks(
-                    original_content, hunks, self.ui
+                    original_content, hunks, ui
                 )
-                # Garantir que modified_content é string para análise de indentação
-                if isinstance(modified_content, list):
-                    modified_content = "\n".join(modified_content)
             # 5. Correção de indentação (se habilitada e há mudanças)
             indentation_warnings = []
             if self.fix_indentation and results['applied'] > 0:
-                if self.indentation_corrector.is_python_file(target_file):
-                    self.ui.show_info("🐍 Ficheiro Python detectado - verificando indentação...")
+                if self._looks_like_python(target_file, modified_content):
+                    ui.show_info("🐍 Ficheiro Python detectado - verificando indentação...")
                     
                     # Analisar problemas de indentação
-                    analysis = self.indentation_corrector.analyze_indentation_issues(modified_content)
-                    analysis_summary = self.indentation_corrector.get_correction_summary(analysis)
+                    corrector = self.indentation_corrector
+                    analysis = corrector.analyze_indentation_issues(modified_content, ranges=results.get('changed_ranges'))
+                    analysis_summary = corrector.get_correction_summary(analysis)
                     
                     if analysis['has_tabs'] and analysis['has_spaces'] or analysis['mixed_lines'] or analysis['inconsistent_spacing']:
-                        self.ui.show_info("Problemas de indentação detectados:")
+                        ui.show_info("Problemas de indentação detectados:")
                         print(analysis_summary)
                         
-                        if self.ui.confirm_indentation_fix():
-                            corrected_content, warnings, was_modified = self.indentation_corrector.correct_file_indentation(
+                        if ui.confirm_indentation_fix():
+                            corrected_content, warnings, was_modified = corrector.correct_file_indentation(
                                 modified_content, target_file
                             )
                             
                             if was_modified:
-                                modified_content = corrected_content
+                                modified_content = corrected_content.splitlines(keepends=True)
                                 indentation_warnings = warnings
-                                self.ui.show_success("✅ Indentação corrigida")
-                                self.logger.log_event("INDENTATION_CORRECTED", f"Avisos: {'; '.join(warnings)}")
+                                ui.show_success("✅ Indentação corrigida")
+                                log_event("INDENTATION_CORRECTED", f"Avisos: {'; '.join(warnings)}")
                             else:
                                 if warnings:
-                                    self.ui.show_warning("Correção de indentação falhou ou não foi aplicada - veja avisos.")
+                                    ui.show_warning("Correção de indentação falhou ou não foi aplicada - veja avisos.")
                                     indentation_warnings = warnings
                                 else:
-                                    self.ui.show_info("Nenhuma correção de indentação necessária")
+                                    ui.show_info("Nenhuma correção de indentação necessária")
                         else:
-                            self.ui.show_info("Correção de indentação ignorada")
+                            ui.show_info("Correção de indentação ignorada")
                     else:
-                        self.ui.show_success("✅ Indentação já está consistente")
-                        self.logger.log_event("INDENTATION_CHECK", "Indentação consistente")
+                        ui.show_success("✅ Indentação já está consistente")
+                        log_event("INDENTATION_CHECK", "Indentação consistente")
             
             # 6. Resumo das operações
-            self.ui.show_summary(results, indentation_warnings)
+            ui.show_summary(results, indentation_warnings)
             
             # 7. Confirmação final
             if results['applied'] > 0:
-                if self.ui.confirm_save():
+                if ui.confirm_save():
                     # Criar backup e salvar
-                    backup_path = self.io_handler.create_backup(target_file)
+                    backup_path = io_handler.create_backup(target_file)
                     if backup_path:
-                        self.logger.log_event("BACKUP_CREATED", str(backup_path))
+                        log_event("BACKUP_CREATED", str(backup_path))
                         
-                    if self.io_handler.write_target_file(target_file, modified_content):
-                        self.ui.show_success(f"Ficheiro atualizado: {target_file}")
-                        self.logger.log_event("FILE_SAVED", str(target_file))
+                    if io_handler.write_target_file(target_file, modified_content):
+                        ui.show_success(f"Ficheiro atualizado: {target_file}")
+                        log_event("FILE_SAVED", str(target_file))
                     else:
-                        self.ui.show_error("Erro ao gravar o ficheiro")
+                        ui.show_error("Erro ao gravar o ficheiro")
                         return 1
                 else:
-                    self.ui.show_info("Alterações descartadas")
-                    self.logger.log_event("CHANGES_DISCARDED", "")
+                    ui.show_info("Alterações descartadas")
+                    log_event("CHANGES_DISCARDED", "")
             else:
-                self.ui.show_info("Nenhuma alteração foi aplicada")
+                ui.show_info("Nenhuma alteração foi aplicada")
                 
             return 0
             
         except KeyboardInterrupt:
-            self.ui.show_info("\nOperação cancelada pelo utilizador")
+            ui.show_info("\nOperação cancelada pelo utilizador")
             return 1
         except Exception as e:
-            self.ui.show_error(f"Erro inesperado: {e}")
-            self.logger.log_event("ERROR", str(e))
+            ui.show_error(f"Erro inesperado: {e}")
+            log_event("ERROR", str(e))
             return 1
 
 
@@ -10,6 +10,14 @@ Detecta e extrai informações dos três tipos de hunks suportados
 
 import re
 
+import sys
+
+from bisect import bisect_left
+
+from functools import lru_cache
+
+from itertools import takewhile
+
 from typing import List, Dict, Any, Optional, Tuple
 
 from dataclasses import dataclass
@@ -18,7 +26,29 @@ from dataclasses import dataclass
 
 
 
-@dataclass
+# Prefixos válidos de linha de hunk (membership O(1) no loop de extração)
+
+_PREFIX_CHARS = frozenset(' -+\\')
+
+
+
+# Cabeçalhos de ficheiro testados numa única chamada a startswith
+
+_FILE_HDR = ('---', '+++')
+
+
+
+# Varrimento em bloco do patch inteiro: localiza todos os inícios de linha
+
+# interessantes (hunks e cabeçalhos de ficheiro) numa só passagem em C
+
+_HDR_SCAN_RE = re.compile(r'(?m)^(?:@@|--|\+\+)')
+
+
+
+
+
+@dataclass(slots=True, frozen=True)
 
 class HunkLine:
 
@@ -34,7 +64,23 @@ class HunkLine:
 
 
 
-@dataclass
+@lru_cache(maxsize=4096)
+
+def _context_line(content: str) -> HunkLine:
+
+    """Flyweight para linhas de contexto: a maioria das linhas de um patch
+
+    realista é contexto e muitas repetem-se entre hunks - partilhar a
+
+    instância evita milhares de alocações em diffs grandes"""
+
+    return HunkLine(type=' ', content=content)
+
+
+
+
+
+@dataclass(slots=True)
 
 class Hunk:
 
@@ -46,6 +92,14 @@ class Hunk:
 
     lines: List[HunkLine]
 
+
+
+    # Tipos das linhas em paralelo (um byte por linha): permite varrer
+
+    # hunks grandes a velocidade de C com os métodos de bytes
+
+    types: bytes = b''
+
     
 
     # Para unified diff
@@ -68,6 +122,12 @@ class Hunk:
 
 
 
+    # Posição esperada no ficheiro (0-based), quando conhecida
+
+    expected_line: Optional[int] = None
+
+
+
 
 
 class PatchParser:
@@ -84,6 +144,28 @@ class PatchParser:
 
     IMPLICIT_ANCHOR_RE = re.compile(r'^@@\s*$')
 
+
+
+    # Os três formatos fundidos numa única alternância (unified primeiro,
+
+    # por ser o caso comum): um só match decide o tipo do cabeçalho
+
+    HEADER_RE = re.compile(
+
+        r'^@@(?:'
+
+        r'\s*-(?P<old_start>\d+)(?:,(?P<old_count>\d+))?'
+
+        r'\s*\+(?P<new_start>\d+)(?:,(?P<new_count>\d+))?\s*@@.*'
+
+        r'|\s+(?P<anchor>.+)'
+
+        r'|\s*$'
+
+        r')$'
+
+    )
+
     
 
     def parse_patch(self, patch_content: str) -> List[Hunk]:
@@ -108,21 +190,91 @@ class PatchParser:
 
         lines = patch_content.splitlines()
 
-        hunks = []
 
-        i = 0
+
+        # Mapear os offsets dos cabeçalhos para índices de linha contando
+
+        # newlines em C entre matches consecutivos: o loop Python corre
+
+        # O(cabeçalhos), não O(linhas). Só é válido quando splitlines
+
+        # separa exatamente por \n (o caso normal); caso contrário (\r ou
+
+        # separadores Unicode soltos) o loop de parsing recalcula sozinho
+
+        interesting = None
+
+        if len(lines) == patch_content.count('\n') + (not patch_content.endswith('\n')):
+
+            interesting = []
+
+            line_no = 0
+
+            prev = 0
+
+            count_nl = patch_content.count
+
+            for m in _HDR_SCAN_RE.finditer(patch_content):
+
+                start = m.start()
+
+                line_no += count_nl('\n', prev, start)
+
+                prev = start
+
+                interesting.append(line_no)
+
+
+
+        return self._parse_lines(lines, interesting)
+
+
+
+    def _parse_lines(self, lines: List[str], interesting: Optional[List[int]] = None) -> List[Hunk]:
+
+        """Loop de parsing comum sobre as linhas já separadas"""
+
+        hunks = []
 
         old_file = None
 
         current_file = None
 
-        
 
-        while i < len(lines):
+
+        # Ligações locais para o loop quente (evita lookups repetidos)
+
+        parse_hunk = self._parse_hunk
+
+        append_hunk = hunks.append
+
+
+
+        # Jump-scan: só as linhas que podem iniciar algo interessante
+
+        # (hunks e cabeçalhos de ficheiro) entram no loop Python; o resto
+
+        # do patch (corpos de hunk, lixo de cabeçalho, secções binárias)
+
+        # é saltado com bisect sobre esta lista pré-computada
+
+        if interesting is None:
+
+            interesting = [idx for idx, l in enumerate(lines) if l[:2] in ('@@', '--', '++')]
+
+        k = 0
+
+        m = len(interesting)
+
+
+
+        while k < m:
+
+            i = interesting[k]
 
             line = lines[i]
 
-            
+
 
             # Pular linhas de cabeçalho de ficheiro (--- e +++)
 
@@ -136,7 +288,7 @@ class PatchParser:
 
                 old_file = None if old_file_line.strip() == '/dev/null' else old_file_line
 
-                i += 1
+                k += 1
 
                 continue
 
@@ -152,31 +304,37 @@ class PatchParser:
 
                 current_file = old_file if new_file is None else new_file
 
-                i += 1
+                k += 1
 
                 continue
 
             
 
-            # Procurar início de hunk
+            # Procurar início de hunk (comparação por slice: mais barata
 
-            if line.startswith('@@'):
+            # que startswith para prefixos de 2 caracteres)
 
-                hunk, next_i = self._parse_hunk(lines, i)
+            if line[:2] == '@@':
+
+                hunk, next_i = parse_hunk(lines, i)
 
                 if hunk:
 
                     hunk.file_path = current_file
 
-                    hunks.append(hunk)
+                    append_hunk(hunk)
+
+                # Saltar diretamente para a próxima linha interessante
+
+                # depois do hunk consumido
 
-                i = next_i
+                k = bisect_left(interesting, next_i)
 
             else:
 
-                i += 1
+                k += 1
+
 
-        
 
         return hunks
 
@@ -212,41 +370,33 @@ class PatchParser:
 
         header_line = lines[start_idx]
 
-        
 
-        # Detectar tipo de hunk
 
-        unified_match = self.UNIFIED_HEADER_RE.match(header_line)
+        # Detectar tipo de hunk com um único match sobre a regex fundida
 
-        explicit_anchor_match = self.EXPLICIT_ANCHOR_RE.match(header_line)
+        if (match := self.HEADER_RE.match(header_line)):
 
-        implicit_anchor_match = self.IMPLICIT_ANCHOR_RE.match(header_line)
+            if match.group('old_start') is not None:
 
-        
+                return self._parse_unified_hunk(lines, start_idx, match)
 
-        if unified_match:
+            if match.group('anchor') is not None:
 
-            return self._parse_unified_hunk(lines, start_idx, unified_match)
+                return self._parse_explicit_anchor_hunk(lines, start_idx, match)
 
-        elif explicit_anchor_match:
+            return self._parse_implicit_anchor_hunk(lines, start_idx)
 
-            return self._parse_explicit_anchor_hunk(lines, start_idx, explicit_anchor_match)
 
-        elif implicit_anchor_match:
 
-            return self._parse_implicit_anchor_hunk(lines, start_idx)
+        # Heurística: se após @@ há várias linhas - seguidas de +, tratar como unified sem offsets
 
-        else:
+        hunk_lines, types, next_idx = self._extract_hunk_lines(lines, start_idx + 1)
 
-            # Heurística: se após @@ há várias linhas - seguidas de +, tratar como unified sem offsets
+        if self._looks_like_unified_without_offsets(types):
 
-            hunk_lines = self._extract_hunk_lines(lines, start_idx + 1)
+            return self._parse_unified_hunk_auto(lines, start_idx, hunk_lines, types, next_idx)
 
-            if self._looks_like_unified_without_offsets(hunk_lines):
 
-                return self._parse_unified_hunk_auto(lines, start_idx, hunk_lines)
-
-        
 
         return None, start_idx + 1
 
@@ -256,19 +406,23 @@ class PatchParser:
 
         """Parse de hunk unified diff clássico"""
 
-        old_start = int(match.group(1))
+        old_start = int(match.group('old_start'))
 
-        old_count = int(match.group(2)) if match.group(2) else 1
+        old_count = int(match.group('old_count')) if match.group('old_count') else 1
 
-        new_start = int(match.group(3))
+        new_start = int(match.group('new_start'))
 
-        new_count = int(match.group(4)) if match.group(4) else 1
+        new_count = int(match.group('new_count')) if match.group('new_count') else 1
 
         
 
-        hunk_lines, next_idx = self._extract_hunk_lines(lines, start_idx + 1)
+        # O cabeçalho diz quantas linhas o hunk tem: pré-alocar evita os
+
+        # redimensionamentos da lista em hunks gigantes
+
+        hunk_lines, types, next_idx = self._extract_hunk_lines(lines, start_idx + 1, size_hint=old_count + new_count)
+
 
-        
 
         hunk = Hunk(
 
@@ -278,17 +432,21 @@ class PatchParser:
 
             lines=hunk_lines,
 
+            types=types,
+
             old_start=old_start,
 
             old_count=old_count,
 
             new_start=new_start,
 
-            new_count=new_count
+            new_count=new_count,
+
+            expected_line=old_start - 1
 
         )
 
-        
+
 
         return hunk, next_idx
 
@@ -298,11 +456,11 @@ class PatchParser:
 
         """Parse de hunk com âncora explícita"""
 
-        anchor_text = match.group(1).strip()
+        anchor_text = match.group('anchor').strip()
+
+        hunk_lines, types, next_idx = self._extract_hunk_lines(lines, start_idx + 1)
 
-        hunk_lines, next_idx = self._extract_hunk_lines(lines, start_idx + 1)
 
-        
 
         hunk = Hunk(
 
@@ -312,6 +470,8 @@ class PatchParser:
 
             lines=hunk_lines,
 
+            types=types,
+
             anchor=anchor_text
 
         )
@@ -326,27 +486,23 @@ class PatchParser:
 
         """Parse de hunk com âncora implícita"""
 
-        hunk_lines, next_idx = self._extract_hunk_lines(lines, start_idx + 1)
-
-        
+        hunk_lines, types, next_idx = self._extract_hunk_lines(lines, start_idx + 1)
 
-        # Extrair âncora implícita (primeiro bloco de linhas -)
 
-        anchor_lines = []
 
-        for hunk_line in hunk_lines:
+        # Extrair âncora implícita (primeiro bloco de linhas -, parando
 
-            if hunk_line.type == '-':
+        # na primeira linha +) numa única expressão sem lista intermédia
 
-                anchor_lines.append(hunk_line.content)
+        anchor = '\n'.join(
 
-            elif hunk_line.type == '+':
+            hunk_line.content
 
-                break  # Parar quando encontrar primeira linha +
+            for hunk_line in takewhile(lambda hl: hl.type != '+', hunk_lines)
 
-        
+            if hunk_line.type == '-'
 
-        anchor = '\n'.join(anchor_lines) if anchor_lines else None
+        ) or None
 
         
 
@@ -358,6 +514,8 @@ class PatchParser:
 
             lines=hunk_lines,
 
+            types=types,
+
             anchor=anchor
 
         )
@@ -368,17 +526,19 @@ class PatchParser:
 
     
 
-    def _parse_unified_hunk_auto(self, lines: List[str], start_idx: int, hunk_lines: List[HunkLine]) -> Tuple[Optional[Hunk], int]:
+    def _parse_unified_hunk_auto(self, lines: List[str], start_idx: int, hunk_lines: List[HunkLine], types: bytes, next_idx: int) -> Tuple[Optional[Hunk], int]:
 
         """Parse de hunk unified sem offsets (calculados automaticamente)"""
 
-        # Calcular offsets baseados no conteúdo
+        # Calcular offsets a partir dos tipos em bytes (contagens a velocidade de C)
 
-        old_count = sum(1 for line in hunk_lines if line.type in [' ', '-'])
+        context_count = types.count(b' ')
+
+        old_count = context_count + types.count(b'-')
+
+        new_count = context_count + types.count(b'+')
 
-        new_count = sum(1 for line in hunk_lines if line.type in [' ', '+'])
 
-        
 
         hunk = Hunk(
 
@@ -388,6 +548,8 @@ class PatchParser:
 
             lines=hunk_lines,
 
+            types=types,
+
             old_start=1,  # Será calculado durante aplicação
 
             old_count=old_count,
@@ -398,13 +560,13 @@ class PatchParser:
 
         )
 
-        
 
-        return hunk, start_idx + 1 + len(hunk_lines)
+
+        return hunk, next_idx
 
     
 
-    def _extract_hunk_lines(self, lines: List[str], start_idx: int) -> Tuple[List[HunkLine], int]:
+    def _extract_hunk_lines(self, lines: List[str], start_idx: int, size_hint: int = 0) -> Tuple[List[HunkLine], bytes, int]:
 
         """
 
@@ -418,21 +580,43 @@ class PatchParser:
 
             start_idx: Índice de início
 
+            size_hint: Número esperado de linhas (pré-aloca a lista)
+
             
 
         Returns:
 
-            Tupla (lista de HunkLine, próximo índice)
+            Tupla (lista de HunkLine, tipos em bytes, próximo índice)
 
         """
 
-        hunk_lines = []
+        hunk_lines = [None] * size_hint if size_hint > 0 else []
+
+        count = 0
+
+        types = bytearray()
 
         i = start_idx
 
-        
+        n = len(lines)
+
+        # Próxima linha não-vazia conhecida: blocos de linhas em branco
+
+        # consecutivas partilham o mesmo resultado, por isso o rescan que
+
+        # era O(n²) em patches cheios de linhas vazias passa a O(n)
 
-        while i < len(lines):
+        next_non_empty_cached = -1
+
+
+
+        append_line = hunk_lines.append
+
+        append_type = types.append
+
+
+
+        while i < n:
 
             line = lines[i]
 
@@ -440,15 +624,15 @@ class PatchParser:
 
             # Parar se encontrar início de próximo hunk
 
-            if line.startswith('@@'):
+            if line[:2] == '@@':
 
                 break
 
-            
+
 
             # Parar se encontrar cabeçalho de ficheiro
 
-            if line.startswith('---') or line.startswith('+++'):
+            if line.startswith(_FILE_HDR):
 
                 break
 
@@ -456,31 +640,35 @@ class PatchParser:
 
             # Linha vazia marca fim do hunk para alguns formatos
 
-            if not line.strip() and len(hunk_lines) > 0:
+            # (count, não len(hunk_lines): a lista pode estar pré-alocada)
+
+            if not line.strip() and count > 0:
 
                 # Verificar se próxima linha não-vazia é início de hunk
 
-                next_non_empty = self._find_next_non_empty(lines, i + 1)
+                if next_non_empty_cached <= i:
+
+                    next_non_empty = self._find_next_non_empty(lines, i + 1)
+
+                    next_non_empty_cached = n if next_non_empty is None else next_non_empty
 
-                if next_non_empty is not None and lines[next_non_empty].startswith('@@'):
+                if next_non_empty_cached < n and lines[next_non_empty_cached][:2] == '@@':
 
                     break
 
             
 
-            # Classificar tipo de linha
+            # Classificar tipo de linha: um único slice cobre também a
 
-            if len(line) == 0:
+            # linha vazia (''), que cai no ramo de contexto
 
-                line_type = ' '
-
-                content = ''
+            prefix = line[:1]
 
-            elif line[0] in [' ', '-', '+', '\\']:
+            if prefix in _PREFIX_CHARS:
 
-                line_type = line[0]
+                line_type = prefix
 
-                content = line[1:] if len(line) > 1 else ''
+                content = line[1:]
 
             else:
 
@@ -492,80 +680,94 @@ class PatchParser:
 
             
 
-            hunk_lines.append(HunkLine(type=line_type, content=content))
+            # Intern de linhas curtas: linhas de contexto repetidas entre
 
-            i += 1
+            # hunks partilham a mesma string e comparam por ponteiro
 
-        
+            if len(content) < 256:
 
-        return hunk_lines, i
+                content = sys.intern(content)
 
-    
+                if line_type == ' ':
 
-    def _find_next_non_empty(self, lines: List[str], start_idx: int) -> Optional[int]:
+                    # Linhas de contexto curtas passam pelo flyweight
 
-        """Encontra próxima linha não-vazia"""
+                    if count < size_hint:
 
-        for i in range(start_idx, len(lines)):
+                        hunk_lines[count] = _context_line(content)
 
-            if lines[i].strip():
+                    else:
 
-                return i
+                        append_line(_context_line(content))
 
-        return None
+                    count += 1
 
-    
+                    append_type(0x20)
 
-    def _looks_like_unified_without_offsets(self, hunk_lines: List[HunkLine]) -> bool:
+                    i += 1
 
-        """
+                    continue
 
-        Verifica se conjunto de linhas parece unified diff sem offsets
 
-        (várias linhas - seguidas de várias linhas +)
 
-        """
+            if count < size_hint:
 
-        if len(hunk_lines) < 2:
+                hunk_lines[count] = HunkLine(type=line_type, content=content)
 
-            return False
+            else:
 
-        
+                append_line(HunkLine(type=line_type, content=content))
 
-        # Procurar padrão: linhas -, depois linhas +
+            count += 1
 
-        has_removals = any(line.type == '-' for line in hunk_lines)
+            append_type(ord(line_type))
 
-        has_additions = any(line.type == '+' for line in hunk_lines)
+            i += 1
 
-        
 
-        if not (has_removals and has_additions):
 
-            return False
+        # Truncar o excesso quando o hint sobrestimou (ex.: hunk truncado)
 
-        
+        del hunk_lines[count:]
 
-        # Verificar se existe transição clara de - para +
+        return hunk_lines, bytes(types), i
 
-        in_removals = False
+    
 
-        found_transition = False
+    def _find_next_non_empty(self, lines: List[str], start_idx: int) -> Optional[int]:
 
-        
+        """Encontra próxima linha não-vazia"""
+
+        for i in range(start_idx, len(lines)):
 
-        for line in hunk_lines:
+            if lines[i].strip():
 
-            if line.type == '-':
+                return i
 
-                in_removals = True
+        return None
 
-            elif line.type == '+' and in_removals:
+    
 
-                found_transition = True
+    def _looks_like_unified_without_offsets(self, types: bytes) -> bool:
 
-                break
+        """
 
-        
+        Verifica se conjunto de linhas parece unified diff sem offsets
+
+        (várias linhas - seguidas de várias linhas +)
+
+        """
+
+        if len(types) < 2:
+
+            return False
+
+
+
+        # Basta observar um + depois do primeiro - (o que implica haver
+
+        # remoções e adições); as buscas correm em C sobre os bytes
+
+        first_removal = types.find(b'-')
 
-        return found_transition
\ No newline at end of file
+        return first_removal != -1 and types.find(b'+', first_removal) != -1
\ No newline at end of file
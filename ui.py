@@ -6,10 +6,28 @@ Gere interações com o utilizador e apresentação de informações
 Inclui suporte para correção de indentação Python
 """
 
+import re
+import sys
+from functools import cached_property
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from io_handler import IOHandler
-from logger import PatchLogger
+
+
+# Respostas normalizadas dos prompts: frozenset dá membership O(1) e os
+# literais deixam de ser reconstruídos a cada iteração dos loops de retry
+_YES = frozenset({'s', 'sim', 'y', 'yes'})
+_NO = frozenset({'n', 'não', 'nao', 'no'})
+_QUIT = frozenset({'q', 'quit', 'exit', 'cancel', 'back'})
+_SKIP = frozenset({'s', 'skip'})
+
+# Classificação dos avisos de indentação num único scan em C, sem o
+# .lower() por aviso nem o any() sobre uma lista reconstruída
+_CONVERT_RE = re.compile(r'convertendo|ajustando', re.IGNORECASE)
+
+# Extrai as quatro estatísticas do resumo numa única chamada em C
+_SUMMARY_GET = itemgetter('applied', 'skipped', 'failed', 'warnings')
 
 
 class UserInterface:
@@ -23,10 +41,89 @@ class UserInterface:
     BOLD = '\033[1m'
     RESET = '\033[0m'
     CYAN = '\033[36m'
+
+    # Formatos pré-compostos das mensagens de uma linha: a parte constante
+    # (cor, símbolo, reset, newline) é avaliada uma vez, no import
+    _SUCCESS_FMT = GREEN + '✓ %s' + RESET + '\n'
+    _ERROR_FMT = RED + '✗ %s' + RESET + '\n'
+    _WARNING_FMT = YELLOW + '⚠ %s' + RESET + '\n'
+    _INFO_FMT = BLUE + 'ℹ %s' + RESET + '\n'
     
-    def __init__(self):
+    def __init__(self, logger=None):
         self.io_handler = IOHandler()
-        self.logger = PatchLogger()
+        # Logger partilhado com a aplicação: duas instâncias abririam o
+        # mesmo ficheiro (o nome só tem granularidade de segundo) em 'w'
+        # e uma sobrescreveria os eventos da outra
+        self._logger = logger
+        # Sem TTY (pipe, ficheiro, CI) as sequências ANSI só sujam o
+        # output: anular as cores na instância faz todas as interpolações
+        # renderem vazio, e os formatos pré-compostos são refeitos sem cor
+        if not sys.stdout.isatty():
+            self.BLUE = self.GREEN = self.RED = self.YELLOW = ''
+            self.BOLD = self.RESET = self.CYAN = ''
+            self._SUCCESS_FMT = '✓ %s\n'
+            self._ERROR_FMT = '✗ %s\n'
+            self._WARNING_FMT = '⚠ %s\n'
+            self._INFO_FMT = 'ℹ %s\n'
+        # Moldura do resumo pré-composta uma vez (já com ou sem cor)
+        self._summary_header = f"\n{self.CYAN}=== RESUMO DAS OPERAÇÕES ==={self.RESET}\n"
+        self._summary_footer = f"{self.CYAN}{'=' * 30}{self.RESET}\n"
+        # Última cor emitida via _cwrite (elisão de códigos ANSI repetidos)
+        self._last_color = ''
+        # Cache de listagens .diff por diretório, invalidada por mtime
+        self._diff_cache: Dict[Path, tuple] = {}
+
+    @cached_property
+    def logger(self):
+        """Logger partilhado quando fornecido; caso contrário criado (e o
+        ficheiro de log aberto) apenas no primeiro evento registado:
+        execuções sem âncoras ambíguas nem erros não pagam o custo de
+        arranque"""
+        if self._logger is not None:
+            return self._logger
+        from logger import PatchLogger
+        return PatchLogger()
+
+    def _cwrite(self, buf, color, text):
+        """Anexa texto colorido ao buffer, emitindo o código ANSI apenas
+        quando a cor difere da última escrita: sequências de linhas da
+        mesma cor partilham um único set e um único reset"""
+        if color != self._last_color:
+            buf.append(color if color else self.RESET)
+            self._last_color = color
+        buf.append(text)
+
+    def _cclose(self, buf):
+        """Fecha a sequência de cor aberta por _cwrite, se existir"""
+        if self._last_color:
+            buf.append(self.RESET)
+            self._last_color = ''
+
+    def _ask(self, prompt: str) -> str:
+        """Prompt simples sem o overhead do input() (integração readline,
+        strip automático): escreve, faz flush e lê uma linha de stdin;
+        EOF é tratado como cancelamento, tal como Ctrl+C"""
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        line = sys.stdin.readline()
+        if not line:
+            raise KeyboardInterrupt
+        return line.rstrip('\r\n')
+
+    def _bwrite(self, text: str) -> None:
+        """Emite texto já montado com um único encode e um único write no
+        stream binário, evitando o encode por pedaço do TextIOWrapper;
+        faz fallback para write de texto quando o stdout foi redirecionado
+        para um objeto sem .buffer"""
+        stdout = sys.stdout
+        buffer = getattr(stdout, 'buffer', None)
+        if buffer is not None:
+            stdout.flush()
+            buffer.write(text.encode('utf-8', errors='replace'))
+            buffer.flush()
+        else:
+            stdout.write(text)
+            stdout.flush()
     
     def get_target_file(self) -> Optional[Path]:
         """
@@ -43,7 +140,7 @@ class UserInterface:
             try:
                 path_input = input("Target file path or base directory (or 'q' to quit): ").strip()
                 
-                if path_input.lower() in ['q', 'quit', 'exit']:
+                if path_input.lower() in _QUIT:
                     return None
                 
                 file_path = self.io_handler.validate_file_path(path_input)
@@ -72,9 +169,9 @@ class UserInterface:
         
         while True:
             try:
-                choice = input("\nChoose (1/2 or 'q' to quit): ").strip()
+                choice = self._ask("\nChoose (1/2 or 'q' to quit): ").strip()
                 
-                if choice.lower() in ['q', 'quit', 'exit']:
+                if choice.lower() in _QUIT:
                     return None
                 
                 if choice == '1':
@@ -105,90 +202,150 @@ class UserInterface:
             print(f"\n{self.YELLOW}Patch input canceled.{self.RESET}")
             return None
     
+    def _list_diff_files_cached(self, target_dir: Path) -> List[Path]:
+        """Listagem .diff com cache por diretório: enquanto o mtime do
+        diretório não mudar, voltar ao menu não repete o scan (relevante
+        em sistemas de ficheiros de rede)"""
+        try:
+            mtime = target_dir.stat().st_mtime_ns
+        except OSError:
+            return self.io_handler.list_diff_files(target_dir)
+        cached = self._diff_cache.get(target_dir)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        diff_files = self.io_handler.list_diff_files(target_dir)
+        self._diff_cache[target_dir] = (mtime, diff_files)
+        return diff_files
+
     def _get_patch_from_file(self, target_dir: Path) -> Optional[str]:
         """Obtém patch de ficheiro .diff"""
-        diff_files = self.io_handler.list_diff_files(target_dir)
-        
+        diff_files = self._list_diff_files_cached(target_dir)
+
         if not diff_files:
             print(f"{self.YELLOW}No .diff file found in: {target_dir}{self.RESET}")
             return None
         
-        print(f"\n{self.BOLD}Found .diff files:{self.RESET}")
-        for i, diff_file in enumerate(diff_files, 1):
-            print(f"{i}. {diff_file.name}")
-        
+        # Listagem paginada: diretórios com milhares de patches antigos não
+        # inundam o terminal nem atrasam o menu
+        page_size = 50
+        total = len(diff_files)
+        n_pages = (total + page_size - 1) // page_size
+        page = 0
+
         while True:
+            start = page * page_size
+            buf = [f"\n{self.BOLD}Found .diff files:{self.RESET}\n"]
+            for i, diff_file in enumerate(diff_files[start:start + page_size], start + 1):
+                buf.append(f"{i}. {diff_file.name}\n")
+            if n_pages > 1:
+                buf.append(f"{self.CYAN}Page {page + 1}/{n_pages} ('n' next, 'p' previous){self.RESET}\n")
+            self._bwrite(''.join(buf))
+
             try:
-                choice = input(f"\nChoose a file (1-{len(diff_files)} or 'q' to go back): ").strip()
-                
-                if choice.lower() in ['q', 'quit', 'back']:
+                choice = self._ask(f"\nChoose a file (1-{total} or 'q' to go back): ").strip()
+
+                low = choice.lower()
+                if low in _QUIT:
                     return None
-                
+                if n_pages > 1 and low == 'n':
+                    page = (page + 1) % n_pages
+                    continue
+                if n_pages > 1 and low == 'p':
+                    page = (page - 1) % n_pages
+                    continue
+
                 try:
                     index = int(choice) - 1
-                    if 0 <= index < len(diff_files):
+                    if 0 <= index < total:
                         selected_file = diff_files[index]
                         patch_content = self.io_handler.read_patch_file(selected_file)
-                        
+
                         if patch_content is None:
                             print(f"{self.RED}Error reading selected file.{self.RESET}")
                             continue
-                        
+
                         print(f"{self.GREEN}File loaded: {selected_file.name}{self.RESET}")
                         return patch_content
                     else:
-                        print(f"{self.RED}Invalid number. Choose between 1 and {len(diff_files)}.{self.RESET}")
+                        print(f"{self.RED}Invalid number. Choose between 1 and {total}.{self.RESET}")
                 except ValueError:
                     print(f"{self.RED}Please enter a valid number.{self.RESET}")
-                    
+
             except KeyboardInterrupt:
                 print(f"\n{self.YELLOW}Selection canceled.{self.RESET}")
                 return None
     
-    def disambiguate_anchor(self, content: List[str], anchor: str, matches: List[int], context_lines: int) -> Optional[int]:
+    def disambiguate_anchor(self, content: List[str], anchor: str, matches: List[int], context_lines: int, hint_line: Optional[int] = None) -> Optional[int]:
         """
         Solicita desambiguação quando há múltiplas ocorrências de âncora
-        
+
         Args:
             content: Conteúdo do ficheiro
             anchor: Texto da âncora
             matches: Lista de índices onde a âncora foi encontrada
             context_lines: Número de linhas de contexto a mostrar
-            
+            hint_line: Posição esperada (0-based); quando uma ocorrência é
+                       inequivocamente a mais próxima, é escolhida sem prompt
+
         Returns:
             Índice escolhido ou None se cancelado
         """
-        print(f"\n{self.YELLOW}Multiple occurrences found for anchor:{self.RESET}")
-        print(f"{self.BLUE}{anchor}{self.RESET}\n")
-        
+        # Resolução automática: se o patch diz onde o hunk devia estar e só
+        # uma ocorrência está mais perto dessa posição, não vale a pena
+        # interromper o utilizador - a ida e volta pela UI é de longe a
+        # operação mais lenta de toda a aplicação
+        if hint_line is not None:
+            ranked = sorted(matches, key=lambda m: abs(m - hint_line))
+            if len(ranked) < 2 or abs(ranked[0] - hint_line) < abs(ranked[1] - hint_line):
+                chosen = ranked[0]
+                self.logger.log_event(
+                    "AUTO_DISAMBIGUATION",
+                    f"Escolhida linha {chosen + 1} (esperada {hint_line + 1}) para âncora: {anchor[:50]}"
+                )
+                return chosen
+
+        # Cores em locais: LOAD_FAST em vez de LOAD_ATTR dentro do loop
+        # que pode percorrer milhares de linhas de contexto
+        BLUE, BOLD, RESET = self.BLUE, self.BOLD, self.RESET
+
+        # Montar o menu inteiro em memória e emitir numa única escrita:
+        # um print por linha é um syscall por linha num TTY line-buffered
+        buf = [f"\n{self.YELLOW}Multiple occurrences found for anchor:{RESET}\n"]
+        buf.append(f"{BLUE}{anchor}{RESET}\n\n")
+
         # Mostrar opções com contexto
         for i, match_idx in enumerate(matches, 1):
-            print(f"{self.BOLD}Opção {i} (linha {match_idx + 1}):{self.RESET}")
-            
-            # Calcular contexto
+            buf.append(f"{BOLD}Opção {i} (linha {match_idx + 1}):{RESET}\n")
+
+            # Calcular contexto; a fatia evita a indexação por posição no
+            # loop e o enumerate mantém os números de linha
             start_ctx = max(0, match_idx - context_lines)
             end_ctx = min(len(content), match_idx + context_lines + 1)
-            
-            for line_idx in range(start_ctx, end_ctx):
-                line_num = line_idx + 1
-                line_content = content[line_idx].rstrip('\n')
-                
+
+            # Retirar o '\n' da janela numa única passagem; o slice de um
+            # caractere evita o scan do rstrip (as linhas têm no máximo
+            # um newline final)
+            window = [l[:-1] if l.endswith('\n') else l for l in content[start_ctx:end_ctx]]
+
+            for line_idx, line_content in enumerate(window, start_ctx):
                 # Destacar a linha da âncora
                 if line_idx == match_idx:
-                    print(f"  {self.BLUE}{line_num:4d}: {line_content}{self.RESET}")
+                    buf.append(f"  {BLUE}{line_idx + 1:4d}: {line_content}{RESET}\n")
                 else:
-                    print(f"  {line_num:4d}: {line_content}")
-            
-            print()  # Linha em branco entre opções
-        
+                    buf.append(f"  {line_idx + 1:4d}: {line_content}\n")
+
+            buf.append('\n')  # Linha em branco entre opções
+
+        self._bwrite(''.join(buf))
+
         # Solicitar escolha
         while True:
             try:
-                choice = input(f"Choose occurrence (1-{len(matches)}, 's' to skip, 'q' to cancel): ").strip().lower()
+                choice = self._ask(f"Choose occurrence (1-{len(matches)}, 's' to skip, 'q' to cancel): ").strip().lower()
                 
-                if choice in ['q', 'quit', 'cancel']:
+                if choice in _QUIT:
                     return None
-                elif choice in ['s', 'skip']:
+                elif choice in _SKIP:
                     print(f"{self.YELLOW}Hunk skipped by user.{self.RESET}")
                     return None
                 
@@ -207,27 +364,42 @@ class UserInterface:
                 print(f"\n{self.YELLOW}Disambiguation canceled.{self.RESET}")
                 return None
     
-    def confirm_indentation_fix(self) -> bool:
+    def _prompt_yes_no(self, prompt: str, cancel_message: str) -> bool:
         """
-        Confirma se deve corrigir problemas de indentação
-        
+        Loop comum dos prompts sim/não; Ctrl+C assume 'não'
+
+        Args:
+            prompt: Texto do prompt (já formatado/colorido)
+            cancel_message: Mensagem mostrada quando o utilizador cancela
+
         Returns:
-            True se deve corrigir, False caso contrário
+            True para sim, False para não ou cancelamento
         """
         while True:
             try:
-                response = input(f"{self.YELLOW}Corrigir problemas de indentação? (s/n): {self.RESET}").strip().lower()
-                
-                if response in ['s', 'sim', 'y', 'yes']:
+                response = self._ask(prompt).strip().lower()
+
+                if response in _YES:
                     return True
-                elif response in ['n', 'não', 'nao', 'no']:
+                if response in _NO:
                     return False
-                else:
-                    print(f"{self.RED}Por favor, responda 's' para sim ou 'n' para não{self.RESET}")
-                    
+                print(f"{self.RED}Por favor, responda 's' (sim) ou 'n' (não).{self.RESET}")
+
             except KeyboardInterrupt:
-                print(f"\n{self.YELLOW}Assumindo 'não' (correção ignorada).{self.RESET}")
+                print(f"\n{self.YELLOW}{cancel_message}{self.RESET}")
                 return False
+
+    def confirm_indentation_fix(self) -> bool:
+        """
+        Confirma se deve corrigir problemas de indentação
+
+        Returns:
+            True se deve corrigir, False caso contrário
+        """
+        return self._prompt_yes_no(
+            f"{self.YELLOW}Corrigir problemas de indentação? (s/n): {self.RESET}",
+            "Assumindo 'não' (correção ignorada)."
+        )
     
     def show_indentation_analysis(self, analysis: dict):
         """
@@ -236,32 +408,43 @@ class UserInterface:
         Args:
             analysis: Dicionário com análise de indentação
         """
-        print(f"\n{self.CYAN}=== ANÁLISE DE INDENTAÇÃO ==={self.RESET}")
-        
+        # Caminho rápido para o caso comum (ficheiro limpo): uma linha em
+        # vez do relatório completo com cabeçalho e rodapé
+        clean = (not analysis['mixed_lines'] and not analysis['inconsistent_spacing']
+                 and not (analysis['has_tabs'] and analysis['has_spaces']))
+        if clean:
+            self._bwrite(
+                f"{self.GREEN}✅ Indentação consistente{self.RESET} "
+                f"({analysis['indented_lines']} linhas indentadas de {analysis['total_lines']} total)\n"
+            )
+            return
+
+        buf = [f"\n{self.CYAN}=== ANÁLISE DE INDENTAÇÃO ==={self.RESET}\n"]
+
         if analysis['has_tabs'] and analysis['has_spaces']:
-            print(f"{self.YELLOW}⚠️  Indentação mista detectada (tabs e espaços){self.RESET}")
+            buf.append(f"{self.YELLOW}⚠️  Indentação mista detectada (tabs e espaços){self.RESET}\n")
         elif analysis['has_tabs']:
-            print(f"{self.BLUE}📋 Usando tabs para indentação{self.RESET}")
+            buf.append(f"{self.BLUE}📋 Usando tabs para indentação{self.RESET}\n")
         elif analysis['has_spaces']:
-            print(f"{self.BLUE}📏 Usando espaços para indentação{self.RESET}")
-        
+            buf.append(f"{self.BLUE}📏 Usando espaços para indentação{self.RESET}\n")
+
         if analysis['mixed_lines']:
             count = len(analysis['mixed_lines'])
-            print(f"{self.RED}❌ {count} linha(s) com mistura de tabs e espaços{self.RESET}")
+            buf.append(f"{self.RED}❌ {count} linha(s) com mistura de tabs e espaços{self.RESET}\n")
             if count <= 5:  # Mostrar linhas específicas se poucas
                 lines_str = ', '.join(map(str, analysis['mixed_lines']))
-                print(f"   Linhas: {lines_str}")
-        
+                buf.append(f"   Linhas: {lines_str}\n")
+
         if analysis['inconsistent_spacing']:
-            print(f"{self.YELLOW}⚠️  Tamanhos de indentação inconsistentes:{self.RESET}")
+            # Linhas consecutivas da mesma cor partilham um só set/reset
+            self._cwrite(buf, self.YELLOW, "⚠️  Tamanhos de indentação inconsistentes:\n")
             for size in analysis['inconsistent_spacing']:
-                print(f"   • {size} espaços")
-        
-        if not (analysis['has_tabs'] and analysis['has_spaces']) and not analysis['mixed_lines'] and not analysis['inconsistent_spacing']:
-            print(f"{self.GREEN}✅ Indentação consistente{self.RESET}")
-        
-        print(f"{self.BLUE}📊 {analysis['indented_lines']} linhas indentadas de {analysis['total_lines']} total{self.RESET}")
-        print(f"{self.CYAN}{'=' * 35}{self.RESET}")
+                self._cwrite(buf, '', f"   • {size} espaços\n")
+            self._cclose(buf)
+
+        buf.append(f"{self.BLUE}📊 {analysis['indented_lines']} linhas indentadas de {analysis['total_lines']} total{self.RESET}\n")
+        buf.append(f"{self.CYAN}{'=' * 35}{self.RESET}\n")
+        self._bwrite(''.join(buf))
     
     def show_summary(self, results: Dict[str, Any], indentation_warnings: List[str] = None) -> None:
         """
@@ -271,40 +454,51 @@ class UserInterface:
             results: Dicionário com resultados da aplicação
             indentation_warnings: Lista de avisos da correção de indentação
         """
-        print(f"\n{self.CYAN}=== RESUMO DAS OPERAÇÕES ==={self.RESET}")
-        
-        # Estatísticas de patches
-        applied = results.get('applied', 0)
-        skipped = results.get('skipped', 0)
-        failed = results.get('failed', 0)
-        warnings = results.get('warnings', [])
-        
+        buf = [self._summary_header]
+
+        # Estatísticas de patches: preencher os defaults em falta de uma vez
+        # e extrair os quatro valores com um único itemgetter
+        results = {'applied': 0, 'skipped': 0, 'failed': 0, 'warnings': [], **results}
+        applied, skipped, failed, warnings = _SUMMARY_GET(results)
+
         total_hunks = applied + skipped + failed
         success_rate = (applied / total_hunks * 100) if total_hunks > 0 else 0
-        
-        print(f"{self.GREEN}✓ Aplicados:{self.RESET} {applied}")
-        print(f"{self.YELLOW}⚠ Ignorados:{self.RESET} {skipped}")
-        print(f"{self.RED}✗ Falhados:{self.RESET} {failed}")
-        print(f"{self.BLUE}📊 Taxa de sucesso:{self.RESET} {success_rate:.1f}%")
-        
-        # Avisos de patches
+
+        buf.append(f"{self.GREEN}✓ Aplicados:{self.RESET} {applied}\n")
+        buf.append(f"{self.YELLOW}⚠ Ignorados:{self.RESET} {skipped}\n")
+        buf.append(f"{self.RED}✗ Falhados:{self.RESET} {failed}\n")
+        buf.append(f"{self.BLUE}📊 Taxa de sucesso:{self.RESET} {success_rate:.1f}%\n")
+
+        # Avisos de patches; entradas podem ser (ficheiro, mensagem),
+        # formatadas apenas aqui
         if warnings:
-            print(f"\n{self.YELLOW}Avisos de patches:{self.RESET}")
+            self._cwrite(buf, self.YELLOW, "\nAvisos de patches:\n")
             for warning in warnings:
-                print(f"  • {warning}")
-        
-        # Correções de indentação
+                if isinstance(warning, tuple):
+                    warning = f"{warning[0]}: {warning[1]}"
+                self._cwrite(buf, '', f"  • {warning}\n")
+            self._cclose(buf)
+
+        # Correções de indentação; avisos consecutivos da mesma categoria
+        # partilham um único código de cor
         if indentation_warnings:
-            print(f"\n{self.BLUE}🐍 Correções de indentação:{self.RESET}")
+            RED, YELLOW, GREEN = self.RED, self.YELLOW, self.GREEN
+            cwrite = self._cwrite
+            self._cwrite(buf, self.BLUE, "\n🐍 Correções de indentação:\n")
             for warning in indentation_warnings:
+                if isinstance(warning, tuple):
+                    warning = f"{warning[0]}: {warning[1]}"
                 if "AVISO:" in warning:
-                    print(f"  {self.RED}• {warning}{self.RESET}")
-                elif any(word in warning.lower() for word in ["convertendo", "ajustando"]):
-                    print(f"  {self.YELLOW}• {warning}{self.RESET}")
+                    color = RED
+                elif _CONVERT_RE.search(warning):
+                    color = YELLOW
                 else:
-                    print(f"  {self.GREEN}• {warning}{self.RESET}")
-        
-        print(f"{self.CYAN}{'=' * 30}{self.RESET}")
+                    color = GREEN
+                cwrite(buf, color, f"  • {warning}\n")
+            self._cclose(buf)
+
+        buf.append(self._summary_footer)
+        self._bwrite(''.join(buf))
     
     def confirm_save(self) -> bool:
         """
@@ -313,33 +507,23 @@ class UserInterface:
         Returns:
             True se deve gravar, False caso contrário
         """
-        while True:
-            try:
-                choice = input(f"{self.BOLD}Gravar alterações? (s/n): {self.RESET}").strip().lower()
-                
-                if choice in ['s', 'sim', 'y', 'yes']:
-                    return True
-                elif choice in ['n', 'não', 'nao', 'no']:
-                    return False
-                else:
-                    print(f"{self.RED}Por favor, responda 's' (sim) ou 'n' (não).{self.RESET}")
-                    
-            except KeyboardInterrupt:
-                print(f"\n{self.YELLOW}Assumindo 'não' (alterações não gravadas).{self.RESET}")
-                return False
+        return self._prompt_yes_no(
+            f"{self.BOLD}Gravar alterações? (s/n): {self.RESET}",
+            "Assumindo 'não' (alterações não gravadas)."
+        )
     
     def show_success(self, message: str) -> None:
         """Mostra mensagem de sucesso"""
-        print(f"{self.GREEN}✓ {message}{self.RESET}")
-    
+        self._bwrite(self._SUCCESS_FMT % message)
+
     def show_error(self, message: str) -> None:
         """Mostra mensagem de erro"""
-        print(f"{self.RED}✗ {message}{self.RESET}")
-    
+        self._bwrite(self._ERROR_FMT % message)
+
     def show_warning(self, message: str) -> None:
         """Mostra mensagem de aviso"""
-        print(f"{self.YELLOW}⚠ {message}{self.RESET}")
-    
+        self._bwrite(self._WARNING_FMT % message)
+
     def show_info(self, message: str) -> None:
         """Mostra mensagem informativa"""
-        print(f"{self.BLUE}ℹ {message}{self.RESET}")
\ No newline at end of file
+        self._bwrite(self._INFO_FMT % message)
\ No newline at end of file